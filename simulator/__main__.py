@@ -1,4 +1,4 @@
 from simulator import app
 
 if __name__ == '__main__':
-    app.run()
\ No newline at end of file
+    app.main()
\ No newline at end of file
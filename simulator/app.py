@@ -1,4 +1,11 @@
+import argparse
+import sys
+import time
+
 from simulator.league import League
+from simulator.match import Match
+from simulator.sinks import ConsoleSink, JsonLinesSink, NullSink, ParquetEventSink
+import simulator.configs.league as scl
 
 welcome_message = """
 Welcome to the League Simulator!
@@ -14,6 +21,11 @@ leagues_message = """
 5 - Ligue 1
 """
 
+BATCHED_ENGINE = "batched"
+# Engines that only produce the final statistics of a match
+EVENTLESS_ENGINES = [BATCHED_ENGINE, Match.SCORELINE_ENGINE]
+
+
 def get_league_input():
     try:
         num = int(input(leagues_message))
@@ -21,11 +33,184 @@ def get_league_input():
         return num
     except (ValueError, AssertionError):
         print('Please enter a valid input!')
-        get_league_input()
+        return get_league_input()
 
 
 def run():
     print(welcome_message)
     league_no = get_league_input()
-    league = League(league_no)
+    league = League(league_no, sink=ConsoleSink())
     league.simulate_league()
+
+
+def league_option(value):
+    """Parse a league given by number (1-5) or country name"""
+    options = {country: option for option, country in scl.countries.items()}
+    options.update({str(option): option for option in scl.countries})
+    try:
+        return options[value.lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(
+            f"unknown league {value!r}, choose from {', '.join(options)}"
+        )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator",
+        description=(
+            "Simulate a football league. Without arguments the simulator asks "
+            "for the league interactively."
+        ),
+    )
+    parser.add_argument(
+        "--league",
+        type=league_option,
+        required=True,
+        help="league to simulate, by number (1-5) or country (spain, england, ...)",
+    )
+    parser.add_argument(
+        "--seasons",
+        type=int,
+        default=1,
+        help="seasons to simulate; more than one forecasts the final standings",
+    )
+    parser.add_argument("--seed", type=int, help="seed for reproducible runs")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes (0 or less uses one per CPU)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=Match.ENGINES + [BATCHED_ENGINE],
+        help=(
+            "match engine (default: python, or batched for forecasts); "
+            "forecasts only run on the batched or scoreline engines"
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        help="write the final table or forecast to a .csv, .json or .parquet file",
+    )
+    parser.add_argument(
+        "--events",
+        help="stream the events of a single season to a .jsonl or .parquet file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time the phases of the simulation and print a summary to stderr",
+    )
+    parser.add_argument(
+        "--trace",
+        help="profile the simulation and write a Chrome trace to this file",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="print nothing but errors",
+    )
+    return parser
+
+
+def write_table(table, path):
+    if path.endswith(".parquet"):
+        # Parquet needs string column names; forecasts number the positions
+        table.rename(columns=str).to_parquet(path)
+    elif path.endswith(".csv"):
+        table.to_csv(path)
+    elif path.endswith(".json"):
+        table.to_json(path, orient="records", force_ascii=False)
+    else:
+        raise ValueError(f"Unsupported output format: {path}")
+
+
+def event_sink(path):
+    if path.endswith(".parquet"):
+        return ParquetEventSink(path)
+    return JsonLinesSink(path)
+
+
+def simulate(args):
+    """Run the simulation described by the parsed command line arguments"""
+    workers = args.workers if args.workers > 0 else None
+    if args.events is not None:
+        sink = event_sink(args.events)
+    elif args.quiet:
+        sink = NullSink()
+    else:
+        sink = ConsoleSink()
+    engine = Match.PYTHON_ENGINE if args.engine == BATCHED_ENGINE else args.engine
+    league = League(
+        args.league,
+        sink=sink,
+        seed=args.seed,
+        engine=engine,
+        workers=1 if args.seasons > 1 else workers,
+    )
+
+    start = time.perf_counter()
+    if args.seasons > 1:
+        table = league.forecast(
+            args.seasons,
+            workers=workers,
+            scoreline=args.engine == Match.SCORELINE_ENGINE,
+        )
+        if not args.quiet:
+            print(table.to_string(float_format="{:.3f}".format))
+    else:
+        league.simulate_league(batched=args.engine == BATCHED_ENGINE)
+        table = league.standings.to_dataframe()
+    elapsed = time.perf_counter() - start
+    sink.close()
+
+    if args.output is not None:
+        write_table(table, args.output)
+    if not args.quiet:
+        matches = args.seasons * sum(len(week) for week in league.schedule)
+        print(
+            f"Simulated {matches} matches in {elapsed:.2f}s "
+            f"({matches / elapsed:.0f} matches/s)",
+            file=sys.stderr,
+        )
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        run()
+        return
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.seasons < 1:
+        parser.error("--seasons must be at least 1")
+    if args.engine is None:
+        args.engine = BATCHED_ENGINE if args.seasons > 1 else Match.PYTHON_ENGINE
+    if args.events is not None and args.seasons > 1:
+        parser.error("--events can only be used with a single season")
+    if args.events is not None and args.engine in EVENTLESS_ENGINES:
+        parser.error(f"--events needs an engine that plays events, not {args.engine}")
+    if args.seasons > 1 and args.engine not in EVENTLESS_ENGINES:
+        parser.error(
+            f"forecasts run on the batched or scoreline engine, not {args.engine}"
+        )
+    if args.seasons == 1 and args.engine == BATCHED_ENGINE and args.workers != 1:
+        parser.error("--workers is not used by a single batched season")
+    if (args.profile or args.trace) and args.workers != 1:
+        parser.error("--profile and --trace only profile a run with --workers 1")
+    if args.profile and args.quiet:
+        parser.error("--profile prints a summary, it cannot be used with --quiet")
+    if not (args.profile or args.trace):
+        simulate(args)
+        return
+
+    from simulator.profiling import Profiler
+
+    with Profiler(trace=args.trace is not None) as profiler:
+        simulate(args)
+    if not args.quiet:
+        print(profiler.summary(), file=sys.stderr)
+    if args.trace is not None:
+        profiler.write_chrome_trace(args.trace)
@@ -0,0 +1,170 @@
+import numpy as np
+
+from simulator.match import Match, draw_score, matchup_odds
+import simulator.tables as st
+
+
+class MatchResult:
+    """Final statistics of a match produced by the batched engine.
+
+    Exposes the same `home_side`, `away_side`, `counts`, `stats` and `score`
+    attributes as a `Match`, so it can be passed straight to
+    `League.update_league_table`.
+    """
+
+    def __init__(self, home_side, away_side, counts, matchevents=None):
+        self.home_side = home_side
+        self.away_side = away_side
+        self.counts = counts
+        self.matchevents = matchevents
+
+    stats = Match.stats
+    score = Match.score
+    evaluate_match_result = Match.evaluate_match_result
+    describe_result = Match.describe_result
+    show_match_result = Match.show_match_result
+
+
+def simulate_fixtures(fixtures, rng=None):
+    """Simulate every (home_side, away_side) fixture at once.
+
+    Returns one `MatchResult` per fixture, in order.
+    """
+    counts = simulate_counts(fixtures, rng)
+    return [
+        MatchResult(home, away, counts[index])
+        for index, (home, away) in enumerate(fixtures)
+    ]
+
+
+def simulate_scores(fixtures, rng=None):
+    """Draw only the final score of every fixture.
+
+    Uses the same per-minute draws as `Match.set_scoreline`, without
+    generating any events. `rng` is a single
+    Generator or a list of one Generator per fixture. Returns a (matches, 2)
+    array of home and away goals.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if len(fixtures) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    attempt_odds = np.array(
+        [matchup_odds(home, away).attempt_odds for home, away in fixtures]
+    )
+    if isinstance(rng, np.random.Generator):
+        return draw_score(rng, attempt_odds)
+    return np.stack(
+        [
+            draw_score(generator, fixture_odds)
+            for generator, fixture_odds in zip(rng, attempt_odds)
+        ]
+    )
+
+
+def uniform_draws(rng, matches, num_matches):
+    """One uniform draw per entry of `matches` (sorted match indices).
+
+    `rng` is either a single Generator shared by every match, or a list with
+    one Generator per match, in which case each match only consumes its own
+    stream and its outcome does not depend on the other fixtures.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng.random(matches.size)
+    sizes = np.bincount(matches, minlength=num_matches)
+    return np.concatenate(
+        [generator.random(size) for generator, size in zip(rng, sizes.tolist())]
+    )
+
+
+def simulate_counts(fixtures, rng=None):
+    """Simulate every (home_side, away_side) fixture at once.
+
+    Event triggers, sides, event types, shot outcomes and cards for all the
+    fixtures are drawn over a (matches x minutes x trials) array, following
+    the same rules as `Match` and `Event.resolve_event`. `rng` is a single
+    Generator or a list of one Generator per fixture. Returns a
+    (matches, 2, stats) array of event counts indexed like `Match.statkeys`,
+    home side first.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    num_matches = len(fixtures)
+    counts = np.zeros((num_matches, 2, len(st.STAT_KEYS)), dtype=np.int64)
+    if num_matches == 0:
+        return counts
+
+    attempt_odds = np.array(
+        [matchup_odds(home, away).attempt_odds for home, away in fixtures]
+    )
+
+    if isinstance(rng, np.random.Generator):
+        trials = rng.random((num_matches, st.MINUTES, st.TRIALS))
+    else:
+        trials = np.stack(
+            [generator.random((st.MINUTES, st.TRIALS)) for generator in rng]
+        )
+    triggered = trials < st.EVENT_RATES[None, :, None]
+    matches, minutes, _ = np.nonzero(triggered)
+    side_odds = st.CUMULATIVE_SIDE_ODDS[minutes]
+    side_draws = uniform_draws(rng, matches, num_matches) * side_odds[:, -1]
+    sides = (side_draws >= side_odds[:, 0]).astype(int)
+    cumulative = st.CUMULATIVE_EVENT_ODDS[minutes, sides]
+    delta = attempt_odds[matches, minutes, sides] - st.ATTEMPT_ODDS[minutes, sides]
+    cumulative[:, st.ATTEMPT :] += delta[:, None]
+    event_draws = uniform_draws(rng, matches, num_matches) * cumulative[:, -1]
+    codes = np.minimum(
+        (cumulative <= event_draws[:, None]).sum(axis=1), len(st.EVENT_KEYS) - 1
+    )
+
+    # Foul follow-ups are only ever produced by a Foul, never drawn directly
+    kept = ~np.isin(codes, [st.event_code(key) for key in Match.foulkeys])
+    matches, minutes, sides, codes = (
+        matches[kept],
+        minutes[kept],
+        sides[kept],
+        codes[kept],
+    )
+    np.add.at(counts, (matches, sides, codes), 1)
+    substitution = st.stat_code("Substitution")
+    np.minimum(counts[:, :, substitution], 3, out=counts[:, :, substitution])
+
+    attempts = codes == st.ATTEMPT
+    shot_matches, shot_sides = matches[attempts], sides[attempts]
+    shot_draws = uniform_draws(rng, shot_matches, num_matches)
+    shots = np.minimum(
+        np.searchsorted(st.SHOT_ODDS.cumsum(), shot_draws, side="right"),
+        len(st.SHOT_KEYS) - 1,
+    )
+    shot_codes = np.array([st.stat_code(key) for key in st.SHOT_KEYS])[shots]
+    np.add.at(counts, (shot_matches, shot_sides, shot_codes), 1)
+    on_target = shots == st.SHOT_KEYS.index("On target")
+    target_matches, target_sides = shot_matches[on_target], shot_sides[on_target]
+    goals = uniform_draws(rng, target_matches, num_matches) < st.GOAL_ODDS
+    np.add.at(
+        counts, (target_matches[goals], target_sides[goals], st.stat_code("Goal")), 1
+    )
+    np.add.at(
+        counts,
+        (target_matches[~goals], 1 - target_sides[~goals], st.stat_code("Saved")),
+        1,
+    )
+
+    fouls = codes == st.event_code("Foul")
+    foul_matches, foul_minutes, foul_sides = (
+        matches[fouls],
+        minutes[fouls],
+        sides[fouls],
+    )
+    np.add.at(
+        counts, (foul_matches, 1 - foul_sides, st.stat_code("Free kick won")), 1
+    )
+    card_cumulative = st.CARD_ODDS[foul_minutes, foul_sides].cumsum(axis=1)
+    card_draws = uniform_draws(rng, foul_matches, num_matches)
+    cards = (card_cumulative <= card_draws[:, None]).sum(axis=1)
+    card_codes = np.array([st.stat_code("Yellow card"), st.stat_code("Red card")])
+    booked = cards < 2
+    np.add.at(
+        counts,
+        (foul_matches[booked], foul_sides[booked], card_codes[cards[booked]]),
+        1,
+    )
+    return counts
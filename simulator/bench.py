@@ -0,0 +1,188 @@
+"""Benchmark suite for team construction, matches, seasons and forecasts.
+
+Times each phase for every league in `configs/league.py` and reports the
+matches simulated per second and the peak memory allocated by the phase.
+Run from the project root with:
+
+    python -m simulator.bench [--leagues 1 2] [--json results.json]
+
+Results written with `--json` can be compared across commits.
+"""
+import argparse
+import json
+import platform
+import timeit
+import tracemalloc
+
+import numpy as np
+from tabulate import tabulate
+
+from simulator.league import League
+from simulator.match import Match, compile_matchup
+from simulator.player_store import club_records, load_player_store
+from simulator.team import Team
+import simulator.configs.league as scl
+
+PHASES = ["teams", "match", "season", "forecast"]
+
+
+def clear_caches():
+    """Drop the memoized player data and odds so a phase starts cold"""
+    load_player_store.cache_clear()
+    club_records.cache_clear()
+    compile_matchup.cache_clear()
+
+
+def build_teams(option):
+    return [Team(name) for name in scl.leagues[scl.countries[option]]["teams"]]
+
+
+def play_matches(league, engine, num_matches):
+    names = league.team_names
+    home, away = league.teams[names[0]], league.teams[names[1]]
+    for _ in range(num_matches):
+        Match(home, away, engine=engine)
+
+
+def play_season(option, engine, batched):
+    league = League(option, seed=0, engine=engine)
+    league.simulate_league(batched=batched)
+
+
+def phase_runs(option, args):
+    """Return (phase, matches, callable) for every phase of a league"""
+    league = League(option, seed=0, engine=args.engine)
+    season_matches = sum(len(week) for week in league.schedule)
+    return [
+        ("teams", 0, lambda: build_teams(option)),
+        (
+            "match",
+            args.matches,
+            lambda: play_matches(league, args.engine, args.matches),
+        ),
+        (
+            "season",
+            season_matches,
+            lambda: play_season(option, args.engine, args.batched),
+        ),
+        (
+            "forecast",
+            season_matches * args.seasons,
+            lambda: league.forecast(
+                args.seasons,
+                workers=1,
+                scoreline=args.engine == Match.SCORELINE_ENGINE,
+            ),
+        ),
+    ]
+
+
+def measure(function, repeat, cold):
+    """Best wall time of `repeat` runs, then the peak memory of one more run"""
+    times = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        start = timeit.default_timer()
+        function()
+        times.append(timeit.default_timer() - start)
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run_benchmarks(args):
+    results = []
+    for option in args.leagues:
+        for phase, matches, function in phase_runs(option, args):
+            if phase not in args.phases:
+                continue
+            seconds, peak = measure(function, args.repeat, cold=phase == "teams")
+            results.append(
+                {
+                    "league": scl.leagues[scl.countries[option]]["name"],
+                    "phase": phase,
+                    "seconds": seconds,
+                    "matches": matches,
+                    "matches_per_second": matches / seconds if matches else None,
+                    "peak_memory_mib": peak / 2**20,
+                }
+            )
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m simulator.bench")
+    parser.add_argument(
+        "--leagues",
+        type=int,
+        nargs="+",
+        choices=list(scl.countries),
+        default=list(scl.countries),
+        help="league numbers to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--phases", nargs="+", choices=PHASES, default=PHASES, help="phases to run"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=Match.ENGINES,
+        default=Match.PYTHON_ENGINE,
+        help="engine of single matches and seasons",
+    )
+    parser.add_argument(
+        "--batched", action="store_true", help="play seasons on the batched engine"
+    )
+    parser.add_argument(
+        "--matches", type=int, default=20, help="matches of the match phase"
+    )
+    parser.add_argument(
+        "--seasons", type=int, default=100, help="seasons of the forecast phase"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="timed runs per phase, best is kept"
+    )
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(args)
+    print(
+        tabulate(
+            [
+                [
+                    result["league"],
+                    result["phase"],
+                    result["seconds"],
+                    result["matches_per_second"],
+                    result["peak_memory_mib"],
+                ]
+                for result in results
+            ],
+            headers=["League", "Phase", "Seconds", "Matches/s", "Peak MiB"],
+            tablefmt="github",
+            floatfmt=".3f",
+            missingval="-",
+        )
+    )
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "settings": {
+                key: value for key, value in vars(args).items() if key != "json"
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 import random
+
 import numpy as np
 
-from simulator.configs.odds import odds, shot_outcome
+import simulator.tables as st
+
+POSITIONS = ["goalkeeper", "defenders", "midfielders", "attackers"]
+
+EVENT_DTYPE = np.dtype(
+    [("minute", np.int8), ("side", np.int8), ("event", np.int8), ("player", np.int32)]
+)
 
 
 class Event:
+    __slots__ = ["event", "side", "minute", "player", "sides", "reverse"]
+
     def __init__(self, event, side, minute, player=None):
         self.event = event
         self.side = side
@@ -15,63 +24,120 @@ class Event:
         self.sides = {home_side: "Home", away_side: "Away"}
         self.reverse = {home_side: away_side, away_side: home_side}
 
-    def set_player_for_events(self, eventslist):
-        position = random.choice(
-            ["goalkeeper", "defenders", "midfielders", "attackers"]
-        )
-        players = list(eventslist[0].side.squad[position])
-        player = random.choice(players)
-        for e in eventslist:
-            e.player = player
-            if e.event == "Saved":
-                e.player = e.side.squad["goalkeeper"][0]
-        return eventslist
-
-    def evaluate_event(self):
+    def resolve_event(self, rng=random):
+        """Return the events this event resolves to, without their players"""
         if self.event == "Attempt":
             l = []
             l.append(Event(self.event, self.side, self.minute))
-            attodds = []
-            for oc in list(shot_outcome.keys()):
-                attodds.append(shot_outcome[oc]["Probability"])
-            att = random.choices(list(shot_outcome.keys()), attodds, k=1)[0]
+            att = st.SHOT_KEYS[st.alias_draw(rng.random, *st.SHOT_ALIAS)]
             self.event = att
             l.append(Event(self.event, self.side, self.minute))
             if self.event == "On target":
-                goalodds = []
-                for g in list(shot_outcome["On target"]["is_goal"].values()):
-                    goalodds.append(g)
-                goal = random.choices(["Saved", "Goal"], goalodds, k=1)[0]
+                goal = "Goal" if rng.random() < st.GOAL_ODDS else "Saved"
                 if goal == "Saved":
                     self.side = self.reverse[self.side]
                 self.event = goal
                 l.append(Event(self.event, self.side, self.minute))
-            l = self.set_player_for_events(l)
             return l
         elif self.event == "Foul":
             flist = []  # Foul handling below
             flist.append(Event("Foul", self.side, self.minute))
             flist.append(Event("Free kick won", self.reverse[self.side], self.minute))
-            cardodds = []
-            cardodds.append(
-                odds[self.minute][self.sides[self.side]]["Events"]["Yellow card"]
-                / odds[self.minute][self.sides[self.side]]["Events"]["Foul"]
-            )
-            cardodds.append(
-                odds[self.minute][self.sides[self.side]]["Events"]["Red card"]
-                / odds[self.minute][self.sides[self.side]]["Events"]["Foul"]
-            )
-            cardodds.append(1 - np.array(cardodds).sum())
-            card = random.choices(["Yellow card", "Red card", "No card"], cardodds, k=1)[0]
+            side = st.SIDES.index(self.sides[self.side])
+            probabilities, aliases = st.CARD_ALIAS
+            card = st.CARD_KEYS[
+                st.alias_draw(
+                    rng.random,
+                    probabilities[self.minute][side],
+                    aliases[self.minute][side],
+                )
+            ]
             if card != "No card":
                 flist.append(Event(card, self.side, self.minute))
-            flist = self.set_player_for_events(flist)
             return flist
         else:
             l = []
             l.append(Event(self.event, self.side, self.minute))
-            l = self.set_player_for_events(l)
             return l
 
+    def describe(self):
+        description = [str(self.minute) + "'", self.side.name, self.event]
+        if self.player is not None:
+            description.append(self.player.name)
+        return " ".join(description)
+
     def show_event(self):
-        print(str(self.minute) + "'", self.side.name, self.event, self.player.name)
+        print(self.describe())
+
+
+class EventLog:
+    """Compact record of the events of a match.
+
+    Events are stored as rows of (minute, side, event code, player id) in a
+    structured array, with side 0 for the home side and event codes indexing
+    `simulator.tables.STAT_KEYS`. `Event` objects are only rebuilt when the
+    log is indexed or iterated.
+    """
+
+    __slots__ = ["teams", "records", "size", "players"]
+
+    def __init__(self, home_side, away_side, capacity=256):
+        self.teams = [home_side, away_side]
+        self.records = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.size = 0
+        self.players = None
+
+    @classmethod
+    def from_records(cls, home_side, away_side, records):
+        """Rebuild a log from the `array` of another one, e.g. from a worker"""
+        log = cls(home_side, away_side, capacity=0)
+        log.records = records
+        log.size = len(records)
+        return log
+
+    def append(self, event):
+        self.append_record(
+            event.minute,
+            self.teams.index(event.side),
+            st.STAT_CODES[event.event],
+            event.player.id if event.player is not None else -1,
+        )
+
+    def append_record(self, minute, side, event, player):
+        """Append an event given by side index, stat code and player id"""
+        if self.size == len(self.records):
+            self.records = np.resize(self.records, 2 * len(self.records))
+        self.records[self.size] = (minute, side, event, player)
+        self.size += 1
+
+    @property
+    def array(self):
+        return self.records[: self.size]
+
+    def compact(self):
+        """Drop the unused capacity once the match is over"""
+        self.records = self.records[: self.size].copy()
+
+    def materialize(self, record):
+        if self.players is None:
+            self.players = {
+                player.id: player
+                for team in self.teams
+                for player in team.players.values()
+            }
+        minute, side, event, player = record.tolist()
+        return Event(
+            st.STAT_KEYS[event], self.teams[side], minute, self.players.get(player)
+        )
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.materialize(record) for record in self.array[index]]
+        return self.materialize(self.array[index])
+
+    def __iter__(self):
+        for record in self.array:
+            yield self.materialize(record)
@@ -1,26 +1,90 @@
-import pandas as pd
-from tabulate import tabulate
+from concurrent.futures import ProcessPoolExecutor
 
-from simulator.match import Match
+import numpy as np
+
+from simulator.batch import (
+    MatchResult,
+    simulate_counts,
+    simulate_fixtures,
+    simulate_scores,
+)
+from simulator.event import EventLog
+from simulator.match import Match, matchup_odds
+from simulator.outcomes import expected_goals, goal_distribution, result_probabilities
+from simulator.rng import RandomStream
+from simulator.sinks import NullSink
+from simulator.standings import GD, LEAGUE_TABLE_ATTRIBUTES, POINTS, Standings
 from simulator.team import Team
 import simulator.configs.league as scl
+import simulator.tables as st
+
+# Seasons simulated per forecast task; each task gets its own RNG stream so
+# results for a given seed do not depend on the number of workers.
+FORECAST_CHUNK_SIZE = 25
+RELEGATION_PLACES = 3
+
+# Child stream keys of a league's RandomStream
+TEAM_STREAM = 0
+FIXTURE_STREAM = 1
+FORECAST_STREAM = 2
+
+forecast_league = None
+fixture_teams = None
+
+
+def init_forecast_worker(option):
+    """Build the teams of a forecast worker once, when the process starts"""
+    global forecast_league
+    forecast_league = League(option)
+
+
+def forecast_seasons(num_seasons, seed_sequence, scoreline):
+    return forecast_league.simulate_seasons(
+        num_seasons, RandomStream(seed_sequence).generator, scoreline
+    )
+
+
+def init_fixture_worker(teams):
+    """Receive the league's teams once per worker, shared by all its fixtures"""
+    global fixture_teams
+    fixture_teams = teams
+
+
+def simulate_fixture(home, away, engine, seed_sequence, attribution):
+    """Play one fixture in a worker and return its counts and event records"""
+    match = Match(
+        fixture_teams[home],
+        fixture_teams[away],
+        engine=engine,
+        rng=RandomStream(seed_sequence),
+        attribution=attribution,
+    )
+    return match.counts, match.matchevents.array
 
 
 class League:
-    LEAGUE_TABLE_ATTRIBUTES = [
-        "Club",
-        "Matches Played",
-        "Wins",
-        "Draws",
-        "Losses",
-        "Points",
-        "GF",
-        "GA",
-        "GD",
-    ]
-
-    def __init__(self, option):
+    LEAGUE_TABLE_ATTRIBUTES = LEAGUE_TABLE_ATTRIBUTES
+
+    def __init__(
+        self,
+        option,
+        sink=None,
+        seed=None,
+        engine=Match.PYTHON_ENGINE,
+        workers=1,
+        attribution=None,
+    ):
+        self.season = 1
         self.week = 0
+        self.sink = sink if sink is not None else NullSink()
+        # Only draw the players of events when someone reads them, unless told
+        self.attribution = (
+            attribution if attribution is not None else self.sink.writes_events
+        )
+        self.rng = RandomStream(seed)
+        self.engine = engine
+        self.workers = workers
+        self.option = option
         self.name = scl.leagues[scl.countries[option]]["name"]
         self.players = {}
         self.teams = {}
@@ -31,8 +95,8 @@ class League:
         self.standings = self.init_league_table()
 
     def set_teams(self):
-        for name in self.team_names:
-            team = Team(name)
+        for index, name in enumerate(self.team_names):
+            team = Team(name, self.rng.child(TEAM_STREAM, index))
             self.teams[name] = team
 
     def set_players(self):
@@ -63,80 +127,303 @@ class League:
         return schedule
 
     def init_league_table(self):
-        table = pd.DataFrame(columns=League.LEAGUE_TABLE_ATTRIBUTES)
-        for team in self.team_names:
-            row = pd.DataFrame(
-                [[team, 0, 0, 0, 0, 0, 0, 0, 0]],
-                columns=League.LEAGUE_TABLE_ATTRIBUTES,
-            )
-            table = pd.concat([table, row])
-        table = table.reset_index(drop=True)
-        table.index = table.index + 1
-        return table
+        return Standings(self.team_names)
+
+    def describe_league_table(self):
+        from tabulate import tabulate
+
+        table = self.standings.to_dataframe()
+        return tabulate(table, headers=table.columns, tablefmt="github")
 
     def show_league_table(self):
-        print(
-            tabulate(self.standings, headers=self.standings.columns, tablefmt="github")
-        )
+        print(self.describe_league_table())
 
     def update_league_table(self, match):
-        (result, winner, loser) = match.evaluate_match_result()
-        table = self.standings
-        num_winner_goals = match.stats[winner]["Goal"]
-        num_loser_goals = match.stats[loser]["Goal"]
-        goal_difference = num_winner_goals - num_loser_goals
-        if result == "Draw":
-            for team in [winner, loser]:
-                table.loc[(table["Club"] == team.name)] += [
-                    "",
-                    1,
-                    0,
-                    1,
-                    0,
-                    1,
-                    num_winner_goals,
-                    num_loser_goals,
-                    0,
-                ]
-        else:
-            table.loc[(table["Club"] == winner.name)] += [
-                "",
-                1,
-                1,
-                0,
-                0,
-                3,
-                num_winner_goals,
-                num_loser_goals,
-                goal_difference,
-            ]
-            table.loc[(table["Club"] == loser.name)] += [
-                "",
-                1,
-                0,
-                0,
-                1,
-                0,
-                num_loser_goals,
-                num_winner_goals,
-                -goal_difference,
-            ]
-        table.sort_values(by="Points", inplace=True, ascending=False)
-        table.reset_index(drop=True, inplace=True)
+        home_goals, away_goals = match.score
+        self.standings.record_result(
+            match.home_side.name, match.away_side.name, home_goals, away_goals
+        )
 
-    def simulate_match(self, home_team_name, away_team_name):
+    def start_new_season(self):
+        """Reset the schedule and the table to play the next season"""
+        self.season += 1
+        self.week = 0
+        self.standings = self.init_league_table()
+
+    def begin_match(self, week, index, home_team, away_team):
+        """Tell the sink which match the following events and result belong to.
+
+        Weeks and matches are numbered from 1, matches in schedule order
+        over the whole season.
+        """
+        match = sum(len(fixtures) for fixtures in self.schedule[:week]) + index + 1
+        self.sink.begin_match(self.season, week + 1, match, home_team, away_team)
+
+    def fixture_rng(self, week, index):
+        """Stream of a fixture of this season, whatever order it runs in"""
+        return self.rng.child(FIXTURE_STREAM, self.season, week, index)
+
+    def simulate_match(self, home_team_name, away_team_name, rng=None):
         home_team = self.teams[home_team_name]
         away_team = self.teams[away_team_name]
-        match = Match(home_team, away_team)
-        match.show_match_result()
+        match = Match(
+            home_team,
+            away_team,
+            engine=self.engine,
+            rng=rng,
+            sink=self.sink,
+            attribution=self.attribution,
+        )
+        self.sink.write_result(match)
         self.update_league_table(match)
 
-    def simulate_week(self):
-        for home_team, away_team in self.schedule[self.week]:
-            self.simulate_match(home_team, away_team)
+    def replay_match(self, week, index, attribution=True):
+        """Play the `index`-th fixture of `week` of this season again.
+
+        The fixture's stream gives back the same match that was played in
+        the season, with its players drawn when `attribution` is set, even
+        if the season was played without them.
+        """
+        home, away = self.schedule[week][index]
+        return Match(
+            self.teams[home],
+            self.teams[away],
+            engine=self.engine,
+            rng=self.fixture_rng(week, index),
+            attribution=attribution,
+        )
+
+    def fixture_pool(self):
+        """Process pool whose workers each hold a read-only copy of the teams"""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_fixture_worker,
+            initargs=(self.teams,),
+        )
+
+    def simulate_parallel_week(self, executor):
+        """Play the week's fixtures on `executor`, applying results in order"""
+        fixtures = self.schedule[self.week]
+        results = executor.map(
+            simulate_fixture,
+            [home for home, _ in fixtures],
+            [away for _, away in fixtures],
+            [self.engine] * len(fixtures),
+            [
+                self.fixture_rng(self.week, index).seed_sequence
+                for index in range(len(fixtures))
+            ],
+            [self.attribution] * len(fixtures),
+        )
+        for index, ((home, away), (counts, records)) in enumerate(
+            zip(fixtures, results)
+        ):
+            home_team, away_team = self.teams[home], self.teams[away]
+            self.begin_match(self.week, index, home_team, away_team)
+            events = EventLog.from_records(home_team, away_team, records)
+            if self.sink.writes_events:
+                for event in events:
+                    self.sink.write_event(event)
+            result = MatchResult(home_team, away_team, counts, events)
+            self.sink.write_result(result)
+            self.update_league_table(result)
+
+    def simulate_weeks(self, weeks):
+        """Simulate every fixture of the given weeks as one batched computation"""
+        sides = []
+        generators = []
+        matches = []
+        for week in weeks:
+            for index, (home, away) in enumerate(self.schedule[week]):
+                sides.append((self.teams[home], self.teams[away]))
+                generators.append(self.fixture_rng(week, index).generator)
+                matches.append((week, index))
+        results = simulate_fixtures(sides, generators)
+        for (week, index), result in zip(matches, results):
+            self.begin_match(week, index, result.home_side, result.away_side)
+            self.sink.write_result(result)
+            self.update_league_table(result)
+
+    def simulate_week(self, batched=False, executor=None):
+        """Simulate the current week.
+
+        With `batched` the week runs on the batched engine. Otherwise each
+        fixture is a full `Match`; when the league has more than one worker
+        the fixtures are played on `executor` (or on a pool created for this
+        week only) with the same results as a serial run.
+        """
+        if batched:
+            self.simulate_weeks([self.week])
+        elif self.workers != 1:
+            if executor is None:
+                with self.fixture_pool() as executor:
+                    self.simulate_parallel_week(executor)
+            else:
+                self.simulate_parallel_week(executor)
+        else:
+            for index, (home_team, away_team) in enumerate(self.schedule[self.week]):
+                self.begin_match(
+                    self.week, index, self.teams[home_team], self.teams[away_team]
+                )
+                self.simulate_match(
+                    home_team, away_team, self.fixture_rng(self.week, index)
+                )
         self.week += 1
 
-    def simulate_league(self):
+    def simulate_season(self):
+        """Simulate every remaining week of the schedule in a single batch"""
+        self.simulate_weeks(range(self.week, len(self.schedule)))
+        self.week = len(self.schedule)
+
+    def simulate_seasons(self, num_seasons, rng=None, scoreline=False):
+        """Simulate full seasons without touching the league table.
+
+        Seasons run on the batched engine, or with `scoreline` only draw the
+        final scores. Returns the finishing-position histogram as a (clubs, positions)
+        array together with the points and goal difference totals per club,
+        with clubs in `team_names` order.
+        """
+        rng = rng if rng is not None else self.rng.child(FORECAST_STREAM).generator
+        num_teams = len(self.team_names)
+        club_ids = {name: index for index, name in enumerate(self.team_names)}
+        fixtures = [fixture for week in self.schedule for fixture in week]
+        home = np.array([club_ids[home] for home, _ in fixtures])
+        away = np.array([club_ids[away] for _, away in fixtures])
+        sides = [(self.teams[home], self.teams[away]) for home, away in fixtures]
+        goal = st.stat_code("Goal")
+
+        positions = np.zeros((num_teams, num_teams), dtype=np.int64)
+        total_points = np.zeros(num_teams, dtype=np.int64)
+        total_goal_difference = np.zeros(num_teams, dtype=np.int64)
+        for _ in range(num_seasons):
+            if scoreline:
+                goals = simulate_scores(sides, rng)
+            else:
+                goals = simulate_counts(sides, rng)[:, :, goal]
+            standings = Standings(self.team_names)
+            standings.record_results(home, away, goals[:, 0], goals[:, 1])
+            positions[np.arange(num_teams), standings.positions()] += 1
+            total_points += standings.table[:, POINTS]
+            total_goal_difference += standings.table[:, GD]
+        return positions, total_points, total_goal_difference
+
+    def forecast(self, n_seasons, workers=None, seed=None, scoreline=False):
+        """Forecast the final standings by simulating `n_seasons` seasons.
+
+        Seasons are split into chunks that run on a `ProcessPoolExecutor`
+        with `workers` processes (`workers=1` runs in this process). Every
+        chunk draws from its own child stream of `seed`, or of the league's
+        stream when no seed is given. With `scoreline` the seasons only draw
+        final scores, which is much faster and gives the same distribution.
+        Returns a DataFrame with expected points, expected goal difference,
+        title, top 4 and relegation probabilities and the probability of
+        each finishing position per club.
+        """
+        if n_seasons < 1:
+            raise ValueError(f"n_seasons must be at least 1, got {n_seasons}")
+        chunks = [
+            min(FORECAST_CHUNK_SIZE, n_seasons - start)
+            for start in range(0, n_seasons, FORECAST_CHUNK_SIZE)
+        ]
+        if seed is not None:
+            root = RandomStream(seed)
+        else:
+            root = self.rng.child(FORECAST_STREAM)
+        seed_sequences = [
+            root.child(index).seed_sequence for index in range(len(chunks))
+        ]
+        if workers == 1:
+            results = [
+                self.simulate_seasons(
+                    size, RandomStream(seed_sequence).generator, scoreline
+                )
+                for size, seed_sequence in zip(chunks, seed_sequences)
+            ]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_forecast_worker,
+                initargs=(self.option,),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        forecast_seasons,
+                        chunks,
+                        seed_sequences,
+                        [scoreline] * len(chunks),
+                    )
+                )
+
+        import pandas as pd
+
+        num_teams = len(self.team_names)
+        positions = sum(result[0] for result in results) / n_seasons
+        forecast = pd.DataFrame(
+            {
+                "Club": self.team_names,
+                "Points": sum(result[1] for result in results) / n_seasons,
+                "GD": sum(result[2] for result in results) / n_seasons,
+                "Title": positions[:, 0],
+                "Top 4": positions[:, :4].sum(axis=1),
+                "Relegation": positions[:, num_teams - RELEGATION_PLACES :].sum(
+                    axis=1
+                ),
+            }
+        )
+        for position in range(num_teams):
+            forecast[position + 1] = positions[:, position]
+        forecast.sort_values(by="Points", inplace=True, ascending=False)
+        forecast.reset_index(drop=True, inplace=True)
+        forecast.index = forecast.index + 1
+        return forecast
+
+    def fixture_probabilities(self):
+        """Exact result probabilities of every fixture of the schedule.
+
+        Computed from the scoreline distribution of the match model rather
+        than by simulation. Returns a DataFrame with the week, the clubs,
+        the home win, draw and away win probabilities and the expected goals
+        of every fixture, in schedule order.
+        """
+        import pandas as pd
+
+        fixtures = [
+            (week + 1, home, away)
+            for week, matches in enumerate(self.schedule)
+            for home, away in matches
+        ]
+        attempt_odds = np.array(
+            [
+                matchup_odds(self.teams[home], self.teams[away]).attempt_odds
+                for _, home, away in fixtures
+            ]
+        ).reshape(-1, st.MINUTES, 2)
+        results = result_probabilities(goal_distribution(attempt_odds))
+        goals = expected_goals(attempt_odds)
+        return pd.DataFrame(
+            {
+                "Week": [week for week, _, _ in fixtures],
+                "Home": [home for _, home, _ in fixtures],
+                "Away": [away for _, _, away in fixtures],
+                "Home win": results[:, 0],
+                "Draw": results[:, 1],
+                "Away win": results[:, 2],
+                "Home xG": goals[:, 0],
+                "Away xG": goals[:, 1],
+            }
+        )
+
+    def simulate_league(self, batched=False):
+        if batched:
+            self.simulate_season()
+            self.sink.write_table(self)
+            return
+        if self.workers != 1:
+            with self.fixture_pool() as executor:
+                while self.week < len(self.schedule):
+                    self.simulate_week(executor=executor)
+                    self.sink.write_table(self)
+            return
         while self.week < len(self.schedule):
             self.simulate_week()
-            self.show_league_table()
+            self.sink.write_table(self)
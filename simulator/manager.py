@@ -4,6 +4,6 @@ import simulator.configs.manager as scm
 
 
 class Manager:
-    def __init__(self):
-        self.name = random.choice(scm.names)
-        self.formation = random.choice(scm.formations)
+    def __init__(self, rng=random):
+        self.name = rng.choice(scm.names)
+        self.formation = rng.choice(scm.formations)
@@ -1,99 +1,378 @@
-import copy
-import random
+import bisect
+from collections import namedtuple
+import functools
 
-from simulator.configs.odds import odds
-from simulator.event import Event
+import numpy as np
+
+from simulator.event import Event, EventLog
+from simulator.rng import RandomStream
+from simulator.sinks import NullSink
+import simulator.tables as st
+
+
+def attempt_scaling(home_side, away_side):
+    """Return the (home, away) multipliers applied to the Attempt odds"""
+    hdf = (home_side.defence**2 * home_side.midfield) / (
+        away_side.attack**2 * away_side.midfield
+    )
+    adf = (away_side.defence**2 * away_side.midfield) / (
+        home_side.attack**2 * home_side.midfield
+    )
+    return np.array([1 / (adf**2.33), 1 / (hdf**2.33)])
+
+
+# Child stream of a match's RandomStream that draws the players of its events,
+# one uniform per chain, fetched from its generator in blocks
+ATTRIBUTION_STREAM = 0
+ATTRIBUTION_BLOCK = 256
+
+# Maximum number of (home, away) strength pairings whose odds are kept
+MATCHUP_CACHE_SIZE = 1024
+
+Strengths = namedtuple("Strengths", ["attack", "midfield", "defence"])
+
+
+def team_strengths(side):
+    return Strengths(side.attack, side.midfield, side.defence)
+
+
+class MatchupOdds:
+    """Event odds of one pairing of team strengths, compiled once.
+
+    Holds the scaled Attempt odds and the cumulative event odds with the
+    Attempt column rescaled. The per-minute alias tables of the (side, leaf)
+    a triggered trial resolves to, see `simulator.tables.compile_event_leaves`,
+    are only compiled when an engine first asks for them through
+    `leaf_alias`, and only the minutes asked for are kept as lists.
+    Instances are shared by every match of the pairing.
+    """
+
+    __slots__ = ["attempt_odds", "cumulative_event_odds", "leaf_tables", "leaf_rows"]
+
+    def __init__(self, home_strengths, away_strengths):
+        self.attempt_odds = st.read_only(
+            st.ATTEMPT_ODDS * attempt_scaling(home_strengths, away_strengths)
+        )
+        cumulative = st.CUMULATIVE_EVENT_ODDS.copy()
+        cumulative[:, :, st.ATTEMPT :] += np.expand_dims(
+            self.attempt_odds - st.ATTEMPT_ODDS, -1
+        )
+        self.cumulative_event_odds = st.read_only(cumulative)
+        self.leaf_tables = None
+        self.leaf_rows = [None] * st.MINUTES
+
+    def compile_leaf_tables(self):
+        """(minutes, 2 * leaves) alias probability and alias arrays"""
+        event_odds = st.EVENT_ODDS.copy()
+        event_odds[:, :, st.ATTEMPT] = self.attempt_odds
+        event_odds /= event_odds.sum(axis=2, keepdims=True)
+        leaf_odds = (
+            st.SIDE_PROBABILITIES[:, :, None]
+            * event_odds[:, :, st.LEAF_EVENTS]
+            * st.LEAF_ODDS
+        )
+        probabilities, aliases = st.compile_alias_tables(
+            leaf_odds.reshape(st.MINUTES, -1)
+        )
+        return st.read_only(probabilities), st.read_only(aliases.astype(np.int8))
+
+    def leaf_alias(self, minute):
+        """Alias tables of `minute`'s (side, leaf) draw, as lists"""
+        row = self.leaf_rows[minute]
+        if row is None:
+            if self.leaf_tables is None:
+                self.leaf_tables = self.compile_leaf_tables()
+            probabilities, aliases = self.leaf_tables
+            row = (probabilities[minute].tolist(), aliases[minute].tolist())
+            self.leaf_rows[minute] = row
+        return row
+
+
+@functools.lru_cache(maxsize=MATCHUP_CACHE_SIZE)
+def compile_matchup(home_strengths, away_strengths):
+    return MatchupOdds(home_strengths, away_strengths)
+
+
+def matchup_odds(home_side, away_side):
+    """Return the `MatchupOdds` of two teams from an LRU cache.
+
+    The cache is keyed on the (attack, midfield, defence) of both sides, so
+    repeated fixtures and seasons reuse the compiled odds. Hit and miss
+    counters are available from `compile_matchup.cache_info()`.
+    """
+    return compile_matchup(team_strengths(home_side), team_strengths(away_side))
+
+
+def draw_score(generator, attempt_odds):
+    """Draw final scores straight from scaled Attempt odds of shape (..., 100, 2).
+
+    Each trial of a minute scores for the home side, for the away side or
+    not at all, so a minute's goals are multinomial over its 135 trials:
+    home goals are binomial, and away goals binomial over the trials left
+    with the away probability conditioned on no home goal. Returns the
+    (..., 2) home and away goals summed over the minutes.
+    """
+    goal_odds = st.goal_probabilities(attempt_odds)
+    home_goals = generator.binomial(st.TRIALS, goal_odds[..., 0])
+    away_goals = generator.binomial(
+        st.TRIALS - home_goals, goal_odds[..., 1] / (1 - goal_odds[..., 0])
+    )
+    return np.stack([home_goals.sum(axis=-1), away_goals.sum(axis=-1)], axis=-1)
 
 
 class Match:
+    PYTHON_ENGINE = "python"
+    NUMPY_ENGINE = "numpy"
+    SCORELINE_ENGINE = "scoreline"
+    GEOMETRIC_ENGINE = "geometric"
+    ENGINES = [PYTHON_ENGINE, NUMPY_ENGINE, SCORELINE_ENGINE, GEOMETRIC_ENGINE]
+
     reverse = {"Home": "Away", "Away": "Home"}
-    eventkeys = list(odds[0]["Home"]["Events"].keys())
-    foulkeys = ["Free kick won", "Yellow card", "Second yellow card", "Red card"]
-
-    def __init__(self, home_side, away_side):
-        self.odds = copy.deepcopy(odds)
-        tlist = copy.deepcopy(Match.eventkeys)
-        tlist.extend(
-            ["On target", "Saved", "Off target", "Blocked", "Hit the bar", "Goal"]
-        )
-        self.home_stats = dict(zip(tlist, [0] * len(tlist)))
-        self.away_stats = dict(zip(tlist, [0] * len(tlist)))
+    eventkeys = st.EVENT_KEYS
+    foulkeys = st.FOLLOW_UP_KEYS
+    statkeys = st.STAT_KEYS
+
+    def __init__(
+        self,
+        home_side,
+        away_side,
+        engine=PYTHON_ENGINE,
+        rng=None,
+        sink=None,
+        attribution=True,
+    ):
+        if engine not in Match.ENGINES:
+            raise ValueError(f"Unknown match engine: {engine}")
+        self.engine = engine
+        self.rng = rng if rng is not None else RandomStream()
+        # Players are drawn from their own stream, so whether they are drawn
+        # does not change the events; without attribution they are left out
+        # and can be filled in later by `attribute_players`
+        self.attribution = attribution
+        if attribution:
+            self.player_generator = self.rng.child(ATTRIBUTION_STREAM).generator
+            self.player_draws = iter(())
+        self.sink = sink if sink is not None else NullSink()
+        # Event counts per side, indexed by stat code. `tally` is a flat view
+        # of the same memory that is much cheaper to increment from Python.
+        self.counts = np.zeros((2, len(Match.statkeys)), dtype=np.int64)
+        self.tally = memoryview(self.counts.reshape(-1))
+        self.offsets = {home_side: 0, away_side: len(Match.statkeys)}
         self.home_side = home_side
         self.away_side = away_side
         self.sides = {home_side: "Home", away_side: "Away"}
         self.reverse = {home_side: away_side, away_side: home_side}
-        self.matchevents = []
-        self.stats = dict(
-            zip(
-                [self.home_side, self.away_side],
-                [copy.copy(self.home_stats), copy.copy(self.away_stats)],
-            )
-        )
+        self.matchevents = EventLog(home_side, away_side)
         self.home_players = home_side.players
         self.home_squad = home_side.squad
         self.away_players = away_side.players
         self.away_squad = away_side.squad
         self.set_odds()
         self.set_events(home_side, away_side)
+        self.matchevents.compact()
 
     def set_odds(self):
-        hdf = (self.home_side.defence**2 * self.home_side.midfield) / (
-            self.away_side.attack**2 * self.away_side.midfield
-        )
-        adf = (self.away_side.defence**2 * self.away_side.midfield) / (
-            self.home_side.attack**2 * self.home_side.midfield
-        )
-        for minute in range(100):
-            self.odds[minute]["Home"]["Events"]["Attempt"] = self.odds[minute]["Home"][
-                "Events"
-            ]["Attempt"] / (adf**2.33)
-            self.odds[minute]["Away"]["Events"]["Attempt"] = self.odds[minute]["Away"][
-                "Events"
-            ]["Attempt"] / (hdf**2.33)
+        """Look up this match's odds, scaled by the team strengths"""
+        self.odds = matchup_odds(self.home_side, self.away_side)
+        self.attempt_odds = self.odds.attempt_odds
+
+    def cumulative_event_odds(self, minutes, sides):
+        """Cumulative event odds for the given minutes and side indices (0 home)"""
+        return self.odds.cumulative_event_odds[minutes, sides]
 
     def add_event(self, event):
-        for e in event.evaluate_event():
+        events = event.resolve_event(self.rng.random)
+        if self.attribution:
+            team = events[0].side
+            player = team.starters[self.draw_player(team)]
+            for e in events:
+                e.player = player
+                if e.event == "Saved":
+                    e.player = e.side.starters[e.side.goalkeeper_id]
+        for e in events:
             if e.event == "Substitution":
-                if self.stats[e.side][e.event] < 3:
+                if self.tally[self.offsets[e.side] + st.SUBSTITUTION] < 3:
                     self.track_event(e)
             else:
                 self.track_event(e)
-            e.show_event()
+            self.sink.write_event(e)
             self.matchevents.append(e)
 
     def set_events(self, home_side, away_side):
-        for minute in range(100):
-            for _ in range(135):
-                if random.uniform(0, 1) < self.odds[minute]["Event"]:
-                    plist = []
-                    plist.append(self.odds[minute]["Home"]["Probability"])
-                    plist.append(self.odds[minute]["Away"]["Probability"])
-                    side = random.choices([self.home_side, self.away_side], plist, k=1)[0]
-                    event = random.choices(
-                        Match.eventkeys,
-                        list(self.odds[minute][self.sides[side]]["Events"].values()),
-                        k=1
-                    )[0]
-                    if event not in Match.foulkeys:
-                        e = Event(event, side, minute)
-                        e.set_home_and_away_sides(home_side, away_side)
-                        self.add_event(e)
+        if self.engine == Match.NUMPY_ENGINE:
+            self.set_vectorized_events(home_side, away_side)
+            return
+        if self.engine == Match.SCORELINE_ENGINE:
+            self.set_scoreline()
+            return
+        if self.engine == Match.GEOMETRIC_ENGINE:
+            self.set_geometric_events()
+            return
+        random = self.rng.random
+        for minute in range(st.MINUTES):
+            rate = float(st.EVENT_RATES[minute])
+            for _ in range(st.TRIALS):
+                if random.uniform(0, 1) < rate:
+                    self.trigger_event(minute)
 
-    def track_event(self, event):
-        if event.side == self.home_side:
-            self.home_stats[event.event] = self.home_stats[event.event] + 1
-        else:
-            self.away_stats[event.event] = self.away_stats[event.event] + 1
-        self.stats = dict(
-            zip(
-                [self.home_side, self.away_side],
-                [copy.copy(self.home_stats), copy.copy(self.away_stats)],
+    def trigger_event(self, minute):
+        """Resolve a trial triggered in `minute` with a single draw.
+
+        The draw picks the side and the leaf of the compiled resolution
+        trees, whose chain lists every event the trial produces, e.g.
+        Attempt, On target, Goal.
+        """
+        side, leaf = divmod(
+            st.alias_draw(self.rng.random.random, *self.odds.leaf_alias(minute)),
+            st.LEAVES,
+        )
+        chain = st.LEAF_CHAINS[leaf]
+        if chain:
+            self.add_chain(minute, side, chain)
+
+    def add_chain(self, minute, side, chain):
+        """Attribute and record the events of a resolved chain.
+
+        Events go straight into the tally and the log; `Event` objects are
+        only built when the sink writes events.
+        """
+        teams = (self.home_side, self.away_side)
+        player = self.draw_player(teams[side]) if self.attribution else -1
+        tracked = (
+            chain[0][0] != st.SUBSTITUTION
+            or self.tally[side * len(Match.statkeys) + st.SUBSTITUTION] < 3
+        )
+        for code, opponent in chain:
+            credited = side ^ opponent
+            if code == st.SAVED and player != -1:
+                scorer, scoring_side = teams[credited].goalkeeper_id, credited
+            else:
+                scorer, scoring_side = player, side
+            if tracked:
+                self.tally[credited * len(Match.statkeys) + code] += 1
+            self.matchevents.append_record(minute, credited, code, scorer)
+            if self.sink.writes_events:
+                self.sink.write_event(
+                    Event(
+                        st.STAT_KEYS[code],
+                        teams[credited],
+                        minute,
+                        teams[scoring_side].starters.get(scorer),
+                    )
+                )
+
+    def draw_player(self, team):
+        """Id of the starter of `team` credited with the next chain of events"""
+        uniform = next(self.player_draws, None)
+        if uniform is None:
+            self.player_draws = iter(
+                self.player_generator.random(ATTRIBUTION_BLOCK).tolist()
             )
+            uniform = next(self.player_draws)
+        ids, probabilities, aliases = team.selection
+        return ids[st.alias_index(uniform, probabilities, aliases)]
+
+    def set_geometric_events(self):
+        """Jump straight from one triggered trial to the next.
+
+        A trial triggers with probability `rate = 1 - exp(-hazard)`, so the
+        first trial to trigger is the one at which the hazard accumulated
+        since the last trigger exceeds an exponential draw. Minutes have
+        constant hazard per trial, so the trial is found by bisecting the
+        minute ends and dividing within the minute, and the match needs one
+        draw per event instead of one per trial.
+        """
+        random = self.rng.random
+        hazards = st.TRIAL_HAZARDS.tolist()
+        ends = st.MINUTE_HAZARD_ENDS.tolist()
+        position = 0.0
+        while True:
+            position += random.expovariate(1.0)
+            minute = bisect.bisect_right(ends, position)
+            if minute == st.MINUTES:
+                break
+            start = ends[minute] - st.TRIALS * hazards[minute]
+            trial = min(int((position - start) / hazards[minute]), st.TRIALS - 1)
+            self.trigger_event(minute)
+            position = start + (trial + 1) * hazards[minute]
+
+    def set_vectorized_events(self, home_side, away_side):
+        """Draw every trial of the match in batched NumPy calls.
+
+        All 100 x 135 trigger samples, the side choices and the event-type
+        choices are drawn up front; only the triggered events are turned into
+        `Event` objects, in the same minute order as the per-trial loop.
+        """
+        generator = self.rng.generator
+        triggered = generator.random((st.MINUTES, st.TRIALS)) < st.EVENT_RATES[:, None]
+        minutes = np.nonzero(triggered)[0]
+        side_odds = st.CUMULATIVE_SIDE_ODDS[minutes]
+        side_draws = generator.random(minutes.size) * side_odds[:, -1]
+        sides = (side_draws >= side_odds[:, 0]).astype(int)
+        cumulative = self.cumulative_event_odds(minutes, sides)
+        event_draws = generator.random(minutes.size) * cumulative[:, -1]
+        codes = np.minimum(
+            (cumulative <= event_draws[:, None]).sum(axis=1), len(Match.eventkeys) - 1
         )
+        teams = [self.home_side, self.away_side]
+        for minute, side, code in zip(minutes.tolist(), sides.tolist(), codes.tolist()):
+            event = Match.eventkeys[code]
+            if event not in Match.foulkeys:
+                e = Event(event, teams[side], minute)
+                e.set_home_and_away_sides(home_side, away_side)
+                self.add_event(e)
+
+    def attribute_players(self):
+        """Draw the players of a match played without attribution.
+
+        Replays the attribution stream over the recorded chains, all at once,
+        so the players are the ones the match would have had with
+        attribution on.
+        """
+        if self.attribution:
+            return
+        records = self.matchevents.array
+        codes = records["event"]
+        heads = np.isin(codes, list(st.CHAIN_HEADS))
+        chain_sides = records["side"][heads]
+        generator = self.rng.child(ATTRIBUTION_STREAM).generator
+        uniforms = generator.random(len(chain_sides))
+        chain_players = np.empty(len(chain_sides), dtype=np.int32)
+        teams = (self.home_side, self.away_side)
+        for side, team in enumerate(teams):
+            chains = chain_sides == side
+            chain_players[chains] = team.selection_ids[
+                st.alias_indices(uniforms[chains], *team.selection_arrays)
+            ]
+        players = chain_players[np.cumsum(heads) - 1]
+        saved = codes == st.SAVED
+        keepers = np.array([team.goalkeeper_id for team in teams], dtype=np.int32)
+        players[saved] = keepers[records["side"][saved]]
+        records["player"] = players
+        self.attribution = True
+
+    def set_scoreline(self):
+        """Draw only the final score, without generating any events"""
+        self.counts[:, st.GOAL] = draw_score(self.rng.generator, self.attempt_odds)
+
+    def track_event(self, event):
+        self.tally[self.offsets[event.side] + st.STAT_CODES[event.event]] += 1
+
+    @property
+    def stats(self):
+        """Event counts per side as {team: {event: count}}, built on demand"""
+        return {
+            self.home_side: dict(zip(Match.statkeys, self.counts[0].tolist())),
+            self.away_side: dict(zip(Match.statkeys, self.counts[1].tolist())),
+        }
+
+    @property
+    def score(self):
+        """Goals scored as (home goals, away goals)"""
+        return tuple(self.counts[:, st.GOAL].tolist())
 
     def evaluate_match_result(self):
-        hg = self.stats[self.home_side]["Goal"]
-        ag = self.stats[self.away_side]["Goal"]
+        hg, ag = self.score
         if hg == ag:
             return ("Draw", self.home_side, self.away_side)
         elif hg > ag:
@@ -101,17 +380,19 @@ class Match:
         else:
             return ("Win", self.away_side, self.home_side)
 
-    def show_match_result(self):
-        self.home_goals = self.stats[self.home_side]["Goal"]
-        self.away_goals = self.stats[self.away_side]["Goal"]
-        if self.home_goals > self.away_goals:
-            print(f"{self.home_side.name} won the match")
-            print(f"Score {self.home_goals} - {self.away_goals}")
-        elif self.away_goals > self.home_goals:
-            print(f"{self.away_side.name} won the match")
-            print(f"Score {self.home_goals} - {self.away_goals}")
+    def describe_result(self):
+        home_goals, away_goals = self.score
+        if home_goals > away_goals:
+            outcome = f"{self.home_side.name} won the match"
+        elif away_goals > home_goals:
+            outcome = f"{self.away_side.name} won the match"
         else:
-            print(
-                f"The match between {self.home_side.name} and {self.away_side.name} was a Draw"
+            outcome = (
+                f"The match between {self.home_side.name} and "
+                f"{self.away_side.name} was a Draw"
             )
-            print(f"Score {self.home_goals} - {self.away_goals}")
+        return f"{outcome}\nScore {home_goals} - {away_goals}"
+
+    def show_match_result(self):
+        self.home_goals, self.away_goals = self.score
+        print(self.describe_result())
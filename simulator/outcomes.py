@@ -0,0 +1,111 @@
+"""Exact scoreline probabilities of the match model, without sampling.
+
+Every trial of a minute scores for the home side with probability `h`, for
+the away side with probability `a` or not at all, so the goals of a match
+have the generating function
+
+    G(x, y) = prod over minutes of (1 + h (x - 1) + a (y - 1)) ** 135
+
+The convolution over minutes is done in the Fourier domain: `G` is
+evaluated on an N x N grid of roots of unity, where it equals the 2D DFT of
+the scoreline distribution, and inverted with one FFT. `log G` is evaluated
+from its series in `x - 1` and `y - 1`, whose coefficients only need a few
+sums over the minutes per fixture; goal probabilities per trial are so small
+that the terms beyond `SERIES_ORDER` are below double precision.
+"""
+import math
+
+import numpy as np
+
+from simulator.match import matchup_odds
+import simulator.tables as st
+
+# Scorelines are computed for 0 to SCORE_GRID - 1 goals per side. Larger
+# scores would alias onto the grid, but are far beyond double precision.
+SCORE_GRID = 32
+SERIES_ORDER = 8
+
+SERIES_TERMS = [
+    (home, order - home)
+    for order in range(1, SERIES_ORDER + 1)
+    for home in range(order + 1)
+]
+
+
+def compile_series_basis(size=SCORE_GRID):
+    """(x - 1)**i (y - 1)**j for every series term on the grid of roots of unity"""
+    shifted = np.exp(-2j * np.pi * np.arange(size) / size) - 1
+    return np.array(
+        [np.multiply.outer(shifted**i, shifted**j) for i, j in SERIES_TERMS]
+    )
+
+
+def compile_series_weights():
+    """Factor of each moment in the series of log G"""
+    weights = []
+    for i, j in SERIES_TERMS:
+        order = i + j
+        weights.append(
+            st.TRIALS * (-1) ** (order + 1) * math.comb(order, i) / order
+        )
+    return np.array(weights)
+
+
+SERIES_BASIS = st.read_only(compile_series_basis())
+SERIES_WEIGHTS = st.read_only(compile_series_weights())
+SERIES_POWERS = st.read_only(np.array(SERIES_TERMS).T.copy())
+
+
+def goal_distribution(attempt_odds):
+    """Scoreline probabilities for scaled Attempt odds of shape (..., 100, 2).
+
+    Returns an array of shape (..., SCORE_GRID, SCORE_GRID) whose entry
+    [..., h, a] is the probability that the match ends h - a.
+    """
+    goal_odds = st.goal_probabilities(attempt_odds)
+    home, away = SERIES_POWERS
+    moments = (
+        goal_odds[..., 0, None] ** home * goal_odds[..., 1, None] ** away
+    ).sum(axis=-2)
+    log_transform = np.tensordot(moments * SERIES_WEIGHTS, SERIES_BASIS, axes=1)
+    # Modulus and phase separately, much faster than NumPy's complex exp here
+    transform = np.exp(log_transform.real) * np.exp(1j * log_transform.imag)
+    distribution = np.fft.ifft2(transform).real
+    return np.clip(distribution, 0, None)
+
+
+def scoreline_probabilities(fixtures):
+    """Exact scoreline distributions of (home_side, away_side) fixtures.
+
+    Returns a (fixtures, SCORE_GRID, SCORE_GRID) array, see `goal_distribution`.
+    """
+    attempt_odds = np.array(
+        [matchup_odds(home, away).attempt_odds for home, away in fixtures]
+    ).reshape(-1, st.MINUTES, 2)
+    return goal_distribution(attempt_odds)
+
+
+def result_probabilities(distribution):
+    """Home win, draw and away win probabilities of scoreline distributions.
+
+    Returns an array of shape (..., 3).
+    """
+    return np.stack(
+        [
+            np.tril(distribution, -1).sum(axis=(-2, -1)),
+            np.trace(distribution, axis1=-2, axis2=-1),
+            np.triu(distribution, 1).sum(axis=(-2, -1)),
+        ],
+        axis=-1,
+    )
+
+
+def expected_goals(attempt_odds):
+    """Expected home and away goals, of shape (..., 2)"""
+    return st.TRIALS * st.goal_probabilities(attempt_odds).sum(axis=-2)
+
+
+def match_probabilities(home_side, away_side):
+    """Exact scoreline distribution and (home win, draw, away win) of one match"""
+    distribution = scoreline_probabilities([(home_side, away_side)])[0]
+    return distribution, result_probabilities(distribution)
@@ -1,4 +1,20 @@
 class Player:
+    __slots__ = [
+        "id",
+        "name",
+        "nationality",
+        "overall",
+        "pace",
+        "shooting",
+        "passing",
+        "dribbling",
+        "defending",
+        "physic",
+        "keeping",
+        "team_status",
+        "position",
+    ]
+
     # Positions:
     ATTACKER = "attacker"
     MIDFIELDER = "midfielder"
@@ -19,8 +35,8 @@ class Player:
         "gk_positioning",
     ]
 
-    def __init__(self, df_player):
-        stats = df_player.to_dict()
+    def __init__(self, stats):
+        self.id = stats["id"]
         self.name = stats["short_name"]
         self.nationality = stats["nationality"]
         self.overall = stats["overall"]
@@ -0,0 +1,126 @@
+"""Compact columnar store of the player data used by the simulator.
+
+The store keeps only the columns `Team` and `Player` read, as a structured
+NumPy array sorted by club and saved next to the original pickle, plus a
+JSON index mapping every club to its row range. The array is memory-mapped,
+so building a team only touches the rows of its own squad.
+
+Build (or rebuild) it from the pickle with:
+
+    python -m simulator.scripts.build_player_store
+
+If the store has not been built yet it is built on first use.
+"""
+import functools
+import json
+import os
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+PLAYER_DATA_PATH = os.path.join(DATA_DIR, "player_data")
+PLAYER_STORE_PATH = os.path.join(DATA_DIR, "player_store.npy")
+CLUB_INDEX_PATH = os.path.join(DATA_DIR, "club_index.json")
+
+TEXT_COLUMNS = ["long_name", "short_name", "nationality", "club", "player_positions"]
+NUMBER_COLUMNS = [
+    "overall",
+    "pace",
+    "shooting",
+    "passing",
+    "dribbling",
+    "defending",
+    "physic",
+    "gk_diving",
+    "gk_handling",
+    "gk_kicking",
+    "gk_reflexes",
+    "gk_speed",
+    "gk_positioning",
+]
+
+
+def build_player_store(
+    data_path=PLAYER_DATA_PATH,
+    store_path=PLAYER_STORE_PATH,
+    index_path=CLUB_INDEX_PATH,
+):
+    """Convert the pickled player DataFrame into the columnar store.
+
+    Returns the player array and the club index; they are also written to
+    `store_path` and `index_path` unless the data directory is read-only.
+    """
+    import pandas as pd
+
+    df_players_data = pd.read_pickle(data_path)
+    df_players_data = df_players_data.sort_values(by="club", kind="stable")
+    encoded = {
+        column: df_players_data[column].str.encode("utf-8").to_numpy()
+        for column in TEXT_COLUMNS
+    }
+    dtype = [
+        (column, f"S{max(len(value) for value in encoded[column])}")
+        for column in TEXT_COLUMNS
+    ]
+    dtype += [("overall", np.int16)]
+    dtype += [(column, np.float32) for column in NUMBER_COLUMNS[1:]]
+    store = np.empty(len(df_players_data), dtype=dtype)
+    for column in TEXT_COLUMNS:
+        store[column] = encoded[column]
+    for column in NUMBER_COLUMNS:
+        store[column] = df_players_data[column].to_numpy()
+
+    clubs, starts = np.unique(store["club"], return_index=True)
+    stops = np.append(starts[1:], len(store))
+    club_index = {
+        club.decode("utf-8"): [int(start), int(stop)]
+        for club, start, stop in zip(clubs, starts, stops)
+    }
+    try:
+        np.save(store_path, store)
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(club_index, f, ensure_ascii=False)
+    except OSError:
+        pass
+    return store, club_index
+
+
+@functools.lru_cache(maxsize=None)
+def load_player_store():
+    """Return the memory-mapped player array and the club index"""
+    if not (os.path.exists(PLAYER_STORE_PATH) and os.path.exists(CLUB_INDEX_PATH)):
+        return build_player_store()
+    store = np.load(PLAYER_STORE_PATH, mmap_mode="r")
+    with open(CLUB_INDEX_PATH, encoding="utf-8") as f:
+        club_index = json.load(f)
+    return store, club_index
+
+
+def club_names():
+    """Names of every club in the store, as used in `configs/league.py`"""
+    return list(load_player_store()[1])
+
+
+@functools.lru_cache(maxsize=None)
+def club_records(club):
+    """Return the stats of every player of `club`.
+
+    Each record carries the player's row in the store as its "id". The
+    records of a club are decoded from its row range the first time it
+    is requested and memoized for the rest of the process, so later teams of
+    the same club are a dictionary lookup. They are shared between teams and
+    must be treated as read-only.
+    """
+    store, club_index = load_player_store()
+    start, stop = club_index.get(club, (0, 0))
+    rows = store[start:stop]
+    columns = [
+        [value.decode("utf-8") for value in rows[column].tolist()]
+        for column in TEXT_COLUMNS
+    ]
+    columns += [rows[column].tolist() for column in NUMBER_COLUMNS]
+    columns.append(list(range(start, stop)))
+    return tuple(
+        dict(zip(TEXT_COLUMNS + NUMBER_COLUMNS + ["id"], values))
+        for values in zip(*columns)
+    )
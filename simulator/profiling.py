@@ -0,0 +1,239 @@
+"""Opt-in timing of the simulator's phases, with counters.
+
+A `Profiler` wraps the methods of each phase only while it is enabled, and
+restores the originals when it is disabled, so the simulator runs
+unchanged code when nobody is profiling:
+
+    with Profiler(trace=True) as profiler:
+        league.simulate_league()
+    print(profiler.summary())
+    profiler.write_chrome_trace("season.json")
+
+Phase times are inclusive (`Match.set_events` contains the time of the
+`Match.trigger_event` calls it makes, which contain their `Match.add_chain`).
+RNG calls count the draws made from the per-event `random.Random` streams of
+`RandomStream`s created while profiling, and generator draws the values
+drawn by the vectorized calls of their NumPy `Generator`s.
+Counting replaces the C `random()` with a Python method and roughly
+triples the time of the python engine; pass `count_rng=False` to skip it.
+Only the current process is profiled, not the workers of a process pool.
+"""
+from collections import Counter, defaultdict
+import functools
+import json
+import os
+import random
+import threading
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+import simulator.event as sevent
+import simulator.league as sleague
+import simulator.match as smatch
+import simulator.player_store as splayer_store
+import simulator.rng as srng
+import simulator.team as steam
+
+EVENTS = "events generated"
+RNG_CALLS = "rng calls"
+GENERATOR_DRAWS = "generator draws"
+MATCHES = "matches played"
+
+
+def count_match_events(counters, args, result):
+    counters[MATCHES] += 1
+    counters[EVENTS] += len(args[0].matchevents)
+
+
+def count_fixtures(counters, args, result):
+    counters[MATCHES] += len(args[0])
+
+
+# (owner, attribute, phase, counter) of every profiled phase; the counter is
+# called with the profiler's counters, the positional arguments and the
+# return value.
+PHASES = [
+    (splayer_store, "load_player_store", "load player store", None),
+    (steam, "club_records", "load club records", None),
+    (steam.Team, "__init__", "Team.__init__", None),
+    (smatch.Match, "set_odds", "Match.set_odds", None),
+    (smatch.Match, "set_events", "Match.set_events", count_match_events),
+    (smatch.Match, "trigger_event", "Match.trigger_event", None),
+    (smatch.Match, "add_chain", "Match.add_chain", None),
+    (sevent.Event, "resolve_event", "Event.resolve_event", None),
+    (sleague, "simulate_fixtures", "batch.simulate_fixtures", count_fixtures),
+    (sleague, "simulate_counts", "batch.simulate_counts", count_fixtures),
+    (sleague, "simulate_scores", "batch.simulate_scores", count_fixtures),
+    (sleague.League, "update_league_table", "League.update_league_table", None),
+    (sleague.League, "describe_league_table", "table rendering", None),
+]
+
+
+class CountingRandom(random.Random):
+    """`random.Random` that counts its primitive draws.
+
+    Every method of `random.Random` draws through `random()` or
+    `getrandbits()`, so the sequence of values is unchanged.
+    """
+
+    def random(self):
+        self.counters[RNG_CALLS] += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        self.counters[RNG_CALLS] += 1
+        return super().getrandbits(k)
+
+
+class CountingGenerator(np.random.Generator):
+    """NumPy `Generator` that counts the values drawn by its vectorized calls.
+
+    Only the methods the simulator calls are counted. It shares the bit
+    generator of the one it replaces, so the values are unchanged.
+    """
+
+    def random(self, *args, **kwargs):
+        result = super().random(*args, **kwargs)
+        self.counters[GENERATOR_DRAWS] += np.size(result)
+        return result
+
+    def binomial(self, *args, **kwargs):
+        result = super().binomial(*args, **kwargs)
+        self.counters[GENERATOR_DRAWS] += np.size(result)
+        return result
+
+
+class Profiler:
+    active = None
+
+    def __init__(self, trace=False, count_rng=True):
+        self.trace = trace
+        self.count_rng = count_rng
+        self.totals = defaultdict(float)
+        self.calls = Counter()
+        self.counters = Counter()
+        self.spans = []
+        self.originals = []
+        self.origin = time.perf_counter()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def enable(self):
+        if Profiler.active is not None:
+            raise RuntimeError("Another Profiler is already enabled")
+        Profiler.active = self
+        for owner, attribute, phase, counter in PHASES:
+            timed = self.timed(getattr(owner, attribute), phase, counter)
+            self.patch(owner, attribute, timed)
+        if self.count_rng:
+            counted = self.counted(srng.RandomStream.__init__)
+            self.patch(srng.RandomStream, "__init__", counted)
+
+    def disable(self):
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+        Profiler.active = None
+
+    def patch(self, owner, attribute, replacement):
+        self.originals.append((owner, attribute, getattr(owner, attribute)))
+        setattr(owner, attribute, replacement)
+
+    def timed(self, function, phase, counter):
+        totals, calls, counters, spans = (
+            self.totals,
+            self.calls,
+            self.counters,
+            self.spans,
+        )
+        trace, origin = self.trace, self.origin
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            end = time.perf_counter()
+            totals[phase] += end - start
+            calls[phase] += 1
+            if counter is not None:
+                counter(counters, args, result)
+            if trace:
+                spans.append((phase, start - origin, end - start))
+            return result
+
+        return wrapper
+
+    def counted(self, init):
+        counters = self.counters
+
+        @functools.wraps(init)
+        def wrapper(stream, *args, **kwargs):
+            init(stream, *args, **kwargs)
+            counting = CountingRandom()
+            counting.setstate(stream.random.getstate())
+            counting.counters = counters
+            stream.random = counting
+            generator = CountingGenerator(stream.generator.bit_generator)
+            generator.counters = counters
+            stream.generator = generator
+
+        return wrapper
+
+    def summary(self):
+        """Time per phase and the counters, as a printable table"""
+        rows = [
+            [phase, self.calls[phase], self.totals[phase]]
+            for phase in sorted(self.totals, key=self.totals.get, reverse=True)
+        ]
+        table = tabulate(
+            rows,
+            headers=["Phase", "Calls", "Seconds"],
+            tablefmt="github",
+            floatfmt=".4f",
+        )
+        counters = tabulate(
+            sorted(self.counters.items()),
+            headers=["Counter", "Value"],
+            tablefmt="github",
+        )
+        return f"{table}\n\n{counters}"
+
+    def chrome_trace(self):
+        """The recorded spans in the Chrome trace event format.
+
+        Spans are only recorded by a profiler created with `trace=True`.
+        """
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                "name": phase,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for phase, start, duration in self.spans
+        ]
+        end = max((start + duration for _, start, duration in self.spans), default=0)
+        events.append(
+            {
+                "name": "counters",
+                "ph": "C",
+                "ts": end * 1e6,
+                "pid": pid,
+                "args": dict(self.counters),
+            }
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
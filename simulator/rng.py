@@ -0,0 +1,43 @@
+"""Seedable, splittable random number streams.
+
+Every source of randomness in the simulator draws from a `RandomStream`.
+Streams form a tree: `stream.child(*key)` derives an independent stream
+from the parent's `SeedSequence` and the key alone, so a match gets the
+same numbers whichever order, process or worker it is simulated in.
+"""
+import random
+
+import numpy as np
+
+# Spawn-key prefixes keeping a stream's own generators apart from its children
+GENERATOR_KEY = 0
+RANDOM_KEY = 1
+CHILD_KEY = 2
+
+
+class RandomStream:
+    """A NumPy `Generator` and a `random.Random` seeded from one SeedSequence.
+
+    `generator` serves the vectorized engines, `random` the per-event code
+    that draws one value at a time, where it is much cheaper than NumPy.
+    """
+
+    def __init__(self, seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.derive(GENERATOR_KEY))
+        state = self.derive(RANDOM_KEY).generate_state(4)
+        self.random = random.Random(int.from_bytes(state.tobytes(), "little"))
+
+    def derive(self, *key):
+        return np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + key,
+            pool_size=self.seed_sequence.pool_size,
+        )
+
+    def child(self, *key):
+        """Return the independent stream identified by `key` (non-negative ints)"""
+        return RandomStream(self.derive(CHILD_KEY, *key))
@@ -1,4 +1,11 @@
-import pandas as pd
+"""Print the name of every club in the player data.
 
-df_player_data = pd.read_pickle("simulator/resources/player_data")
-print(df_player_data["club"].unique())
+Run from the project root with:
+
+    python -m simulator.scripts.all_teams
+"""
+from simulator.player_store import club_names
+
+if __name__ == "__main__":
+    for name in club_names():
+        print(name)
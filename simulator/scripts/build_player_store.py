@@ -0,0 +1,15 @@
+"""Rebuild the columnar player store from simulator/data/player_data.
+
+Run from the project root with:
+
+    python -m simulator.scripts.build_player_store
+"""
+from simulator.player_store import (
+    CLUB_INDEX_PATH,
+    PLAYER_STORE_PATH,
+    build_player_store,
+)
+
+if __name__ == "__main__":
+    build_player_store()
+    print(f"Wrote {PLAYER_STORE_PATH} and {CLUB_INDEX_PATH}")
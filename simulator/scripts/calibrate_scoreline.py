@@ -0,0 +1,66 @@
+"""Compare scoreline-only results with the full batched event engine.
+
+Simulates the same fixtures with both engines and prints the mean goals and
+the home win / draw / away win frequencies of each. Run from the project
+root with:
+
+    python -m simulator.scripts.calibrate_scoreline [league number] [matches]
+
+`tests/test_scoreline_calibration.py` asserts the same agreement, and with
+the exact odds of `simulator.outcomes`, within stated tolerances.
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from simulator.batch import simulate_counts, simulate_scores
+from simulator.league import League
+import simulator.tables as st
+
+
+def summarize(goals):
+    home, away = goals[:, 0], goals[:, 1]
+    return [
+        home.mean(),
+        away.mean(),
+        (home > away).mean(),
+        (home == away).mean(),
+        (home < away).mean(),
+    ]
+
+
+def calibrate(option, num_matches):
+    league = League(option)
+    names = league.team_names
+    fixtures = [
+        (league.teams[names[0]], league.teams[names[-1]]),
+        (league.teams[names[len(names) // 2]], league.teams[names[1]]),
+    ]
+    rng = np.random.default_rng(0)
+    for home, away in fixtures:
+        repeated = [(home, away)] * num_matches
+        start = timeit.default_timer()
+        full = simulate_counts(repeated, rng)[:, :, st.GOAL]
+        full_time = timeit.default_timer() - start
+        start = timeit.default_timer()
+        scoreline = simulate_scores(repeated, rng)
+        scoreline_time = timeit.default_timer() - start
+        print(f"{home.name} vs {away.name}")
+        print("             home goals  away goals  home win  draw  away win  seconds")
+        for label, goals, seconds in [
+            ("full engine", full, full_time),
+            ("scoreline", scoreline, scoreline_time),
+        ]:
+            values = summarize(goals)
+            print(
+                f"{label:<12} {values[0]:>10.3f}  {values[1]:>10.3f}"
+                f"  {values[2]:>8.3f}  {values[3]:.3f}  {values[4]:>8.3f}"
+                f"  {seconds:>7.3f}"
+            )
+
+
+if __name__ == "__main__":
+    option = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    num_matches = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    calibrate(option, num_matches)
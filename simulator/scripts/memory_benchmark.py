@@ -0,0 +1,42 @@
+"""Measure the memory retained by the events of one simulated season.
+
+Run from the project root with:
+
+    python -m simulator.scripts.memory_benchmark [league number]
+"""
+import sys
+import tracemalloc
+
+from simulator.league import League
+from simulator.match import Match, matchup_odds
+
+
+def season_event_footprint(option):
+    """Simulate a season and return (matches, events, bytes retained by events)"""
+    league = League(option)
+    # Compile the cached matchup odds first, so they are not counted as events
+    for week in league.schedule:
+        for home, away in week:
+            matchup_odds(league.teams[home], league.teams[away])
+    season_events = []
+    tracemalloc.start()
+    for week in league.schedule:
+        for home, away in week:
+            match = Match(
+                league.teams[home], league.teams[away], engine=Match.NUMPY_ENGINE
+            )
+            season_events.append(match.matchevents)
+            del match
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num_events = sum(len(events) for events in season_events)
+    return len(season_events), num_events, retained
+
+
+if __name__ == "__main__":
+    option = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    num_matches, num_events, retained = season_event_footprint(option)
+    print(f"Matches: {num_matches}")
+    print(f"Events: {num_events}")
+    print(f"Retained by events: {retained / 1024:.1f} KiB")
+    print(f"Per event: {retained / max(num_events, 1):.1f} bytes")
@@ -0,0 +1,54 @@
+"""Measure the start-up cost of the simulator.
+
+Times, in fresh interpreters, `python -m simulator --help`, importing
+`simulator.league`, and starting a "spawn" process pool whose worker
+receives the league's teams, as `League.fixture_pool` does. Run from the
+project root with:
+
+    python -m simulator.scripts.startup_benchmark [runs]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import subprocess
+import sys
+import timeit
+
+from simulator.league import League, init_fixture_worker
+
+COMMANDS = {
+    "python -m simulator --help": [sys.executable, "-m", "simulator", "--help"],
+    "import simulator.league": [sys.executable, "-c", "import simulator.league"],
+}
+
+
+def best_time(function, runs):
+    times = []
+    for _ in range(runs):
+        start = timeit.default_timer()
+        function()
+        times.append(timeit.default_timer() - start)
+    return min(times)
+
+
+def run_command(command):
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def spawn_worker(teams):
+    """Start one spawned worker holding the teams and wait for its first task"""
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_fixture_worker,
+        initargs=(teams,),
+    ) as executor:
+        executor.submit(os.getpid).result()
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for label, command in COMMANDS.items():
+        print(f"{label}: {best_time(lambda: run_command(command), runs):.3f}s")
+    teams = League(2).teams
+    print(f"spawn worker: {best_time(lambda: spawn_worker(teams), runs):.3f}s")
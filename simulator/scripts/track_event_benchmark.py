@@ -0,0 +1,34 @@
+"""Time Match.track_event, the per-event bookkeeping of a match.
+
+Run from the project root with:
+
+    python -m simulator.scripts.track_event_benchmark
+"""
+import timeit
+
+from simulator.event import Event
+from simulator.league import League
+from simulator.match import Match
+
+NUMBER = 100000
+
+
+def track_event_cost():
+    """Return the mean cost of one Match.track_event call in nanoseconds"""
+    league = League(2)
+    home, away = league.teams["Arsenal"], league.teams["Chelsea"]
+    match = Match(home, away, engine=Match.NUMPY_ENGINE)
+    seconds = timeit.timeit(
+        "track_event(home_event); track_event(away_event)",
+        globals={
+            "track_event": match.track_event,
+            "home_event": Event("Attempt", home, 10),
+            "away_event": Event("Saved", away, 10),
+        },
+        number=NUMBER,
+    )
+    return seconds / (NUMBER * 2) * 1e9
+
+
+if __name__ == "__main__":
+    print(f"track_event: {track_event_cost():.0f} ns per event")
@@ -0,0 +1,233 @@
+"""Output sinks for match events, match results and league tables.
+
+`Match` and `League` never print directly: everything they report goes to a
+sink. The default `NullSink` drops all output so batch runs perform no I/O,
+while `ConsoleSink` reproduces the interactive output of the simulator.
+
+Before the events of a match, `League` calls `begin_match` with the season,
+week and match number, so sinks that export events can tag them. Sinks that
+write events set `writes_events`; for the others matches skip building
+`Event` objects.
+"""
+import json
+
+# Rows buffered by `ParquetEventSink` before they are written as a row group
+PARQUET_CHUNK_SIZE = 65536
+
+
+class NullSink:
+    """Discards all output"""
+
+    writes_events = False
+
+    def begin_match(self, season, week, match, home_side, away_side):
+        pass
+
+    def write_event(self, event):
+        pass
+
+    def write_result(self, match):
+        pass
+
+    def write_table(self, league):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(NullSink):
+    """Prints events, results and tables to the terminal"""
+
+    writes_events = True
+
+    def write_event(self, event):
+        print(event.describe())
+
+    def write_result(self, match):
+        print(match.describe_result())
+
+    def write_table(self, league):
+        print(league.describe_league_table())
+
+
+class BufferedTextSink(NullSink):
+    """Keeps the console output in memory instead of printing it"""
+
+    writes_events = True
+
+    def __init__(self):
+        self.lines = []
+
+    def write_event(self, event):
+        self.lines.append(event.describe())
+
+    def write_result(self, match):
+        self.lines.append(match.describe_result())
+
+    def write_table(self, league):
+        self.lines.append(league.describe_league_table())
+
+    def getvalue(self):
+        return "\n".join(self.lines)
+
+
+class JsonLinesSink(NullSink):
+    """Writes one JSON object per event, result and table to a text file.
+
+    Every record is written as soon as it is reported, so memory use does
+    not grow with the number of matches or seasons simulated.
+    """
+
+    writes_events = True
+
+    def __init__(self, file):
+        if isinstance(file, str):
+            self.file = open(file, "w", encoding="utf-8")
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+        self.season = self.week = self.match = None
+        self.home_side = None
+
+    def begin_match(self, season, week, match, home_side, away_side):
+        self.season, self.week, self.match = season, week, match
+        self.home_side = home_side
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_event(self, event):
+        self.write(
+            {
+                "type": "event",
+                "season": self.season,
+                "week": self.week,
+                "match": self.match,
+                "minute": event.minute,
+                "side": "Home" if event.side is self.home_side else "Away",
+                "team": event.side.name,
+                "event": event.event,
+                "player": event.player.name if event.player is not None else None,
+            }
+        )
+
+    def write_result(self, match):
+        self.write(
+            {
+                "type": "result",
+                "season": self.season,
+                "week": self.week,
+                "match": self.match,
+                "home": match.home_side.name,
+                "away": match.away_side.name,
+                "home_goals": match.score[0],
+                "away_goals": match.score[1],
+            }
+        )
+
+    def write_table(self, league):
+        standings = league.standings.to_dataframe()
+        self.write(
+            {
+                "type": "table",
+                "league": league.name,
+                "week": league.week,
+                "standings": json.loads(standings.to_json(orient="records")),
+            }
+        )
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class ParquetEventSink(NullSink):
+    """Streams every event, tagged with its season, week and match, to Parquet.
+
+    Events are buffered by column and written as one row group every
+    `chunk_size` rows, so memory stays bounded however many seasons are
+    simulated. Requires the optional `pyarrow` package.
+    """
+
+    writes_events = True
+    COLUMNS = ["season", "week", "match", "minute", "side", "team", "event", "player"]
+
+    def __init__(self, path, chunk_size=PARQUET_CHUNK_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("ParquetEventSink requires pyarrow") from error
+        self.pa = pa
+        self.schema = pa.schema(
+            [
+                ("season", pa.int32()),
+                ("week", pa.int16()),
+                ("match", pa.int32()),
+                ("minute", pa.int8()),
+                ("side", pa.string()),
+                ("team", pa.string()),
+                ("event", pa.string()),
+                ("player", pa.string()),
+            ]
+        )
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.chunk_size = chunk_size
+        self.columns = {column: [] for column in ParquetEventSink.COLUMNS}
+        self.context = (None, None, None)
+        self.home_side = None
+
+    def begin_match(self, season, week, match, home_side, away_side):
+        self.context = (season, week, match)
+        self.home_side = home_side
+
+    def write_event(self, event):
+        columns = self.columns
+        season, week, match = self.context
+        columns["season"].append(season)
+        columns["week"].append(week)
+        columns["match"].append(match)
+        columns["minute"].append(event.minute)
+        columns["side"].append("Home" if event.side is self.home_side else "Away")
+        columns["team"].append(event.side.name)
+        columns["event"].append(event.event)
+        columns["player"].append(
+            event.player.name if event.player is not None else None
+        )
+        if len(columns["event"]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.columns["event"]:
+            return
+        self.writer.write_table(
+            self.pa.Table.from_pydict(self.columns, schema=self.schema)
+        )
+        for values in self.columns.values():
+            values.clear()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class CallbackSink(NullSink):
+    """Calls `callback(kind, obj)` with kind "event", "result" or "table" """
+
+    writes_events = True
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write_event(self, event):
+        self.callback("event", event)
+
+    def write_result(self, match):
+        self.callback("result", match)
+
+    def write_table(self, league):
+        self.callback("table", league)
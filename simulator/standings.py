@@ -0,0 +1,88 @@
+import numpy as np
+
+LEAGUE_TABLE_ATTRIBUTES = [
+    "Club",
+    "Matches Played",
+    "Wins",
+    "Draws",
+    "Losses",
+    "Points",
+    "GF",
+    "GA",
+    "GD",
+]
+
+PLAYED, WINS, DRAWS, LOSSES, POINTS, GF, GA, GD = range(8)
+
+
+class Standings:
+    """League table kept as an integer array with one row per club.
+
+    Results are recorded in O(1) by club id; the table is only sorted (on
+    points, then goal difference, then goals scored) when it is read.
+    """
+
+    def __init__(self, clubs):
+        self.clubs = list(clubs)
+        self.club_ids = {club: index for index, club in enumerate(self.clubs)}
+        self.table = np.zeros(
+            (len(self.clubs), len(LEAGUE_TABLE_ATTRIBUTES) - 1), dtype=np.int64
+        )
+
+    def record_result(self, home, away, home_goals, away_goals):
+        """Record a single result between two clubs given by name"""
+        for club, scored, conceded in [
+            (home, home_goals, away_goals),
+            (away, away_goals, home_goals),
+        ]:
+            row = self.table[self.club_ids[club]]
+            row[PLAYED] += 1
+            if scored > conceded:
+                row[WINS] += 1
+                row[POINTS] += 3
+            elif scored == conceded:
+                row[DRAWS] += 1
+                row[POINTS] += 1
+            else:
+                row[LOSSES] += 1
+            row[GF] += scored
+            row[GA] += conceded
+            row[GD] += scored - conceded
+
+    def record_results(self, home_ids, away_ids, home_goals, away_goals):
+        """Record many results at once from arrays of club ids and goals"""
+        for ids, scored, conceded in [
+            (home_ids, home_goals, away_goals),
+            (away_ids, away_goals, home_goals),
+        ]:
+            rows = np.zeros((len(ids), self.table.shape[1]), dtype=np.int64)
+            rows[:, PLAYED] = 1
+            rows[:, WINS] = scored > conceded
+            rows[:, DRAWS] = scored == conceded
+            rows[:, LOSSES] = scored < conceded
+            rows[:, POINTS] = 3 * rows[:, WINS] + rows[:, DRAWS]
+            rows[:, GF] = scored
+            rows[:, GA] = conceded
+            rows[:, GD] = scored - conceded
+            np.add.at(self.table, ids, rows)
+
+    def order(self):
+        """Club ids from first to last place"""
+        return np.lexsort(
+            (-self.table[:, GF], -self.table[:, GD], -self.table[:, POINTS])
+        )
+
+    def positions(self):
+        """Finishing position (0 for first) of every club id"""
+        positions = np.empty(len(self.clubs), dtype=np.int64)
+        positions[self.order()] = np.arange(len(self.clubs))
+        return positions
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        order = self.order()
+        table = pd.DataFrame(self.table[order], columns=LEAGUE_TABLE_ATTRIBUTES[1:])
+        table.insert(0, "Club", [self.clubs[index] for index in order])
+        table.index = table.index + 1
+        return table
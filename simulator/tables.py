@@ -0,0 +1,232 @@
+"""Compiled, read-only array views of the odds in `simulator.configs.odds`.
+
+The tables are built once at import and shared by every match, so a match
+only has to keep its own copy of the Attempt column it rescales.
+"""
+import numpy as np
+
+from simulator.configs.odds import odds, shot_outcome
+
+MINUTES = 100
+TRIALS = 135
+SIDES = ["Home", "Away"]
+
+EVENT_KEYS = list(odds[0]["Home"]["Events"].keys())
+STAT_KEYS = EVENT_KEYS + [
+    "On target",
+    "Saved",
+    "Off target",
+    "Blocked",
+    "Hit the bar",
+    "Goal",
+]
+SHOT_KEYS = list(shot_outcome.keys())
+CARD_KEYS = ["Yellow card", "Red card", "No card"]
+# Event types that only follow a Foul; when drawn directly they are dropped
+FOLLOW_UP_KEYS = ["Free kick won", "Yellow card", "Second yellow card", "Red card"]
+
+
+STAT_CODES = {key: code for code, key in enumerate(STAT_KEYS)}
+
+
+def event_code(name):
+    return EVENT_KEYS.index(name)
+
+
+def stat_code(name):
+    return STAT_CODES[name]
+
+
+ATTEMPT = event_code("Attempt")
+GOAL = stat_code("Goal")
+SAVED = stat_code("Saved")
+SUBSTITUTION = stat_code("Substitution")
+
+
+def compile_event_rates():
+    return np.array([odds[minute]["Event"] for minute in range(MINUTES)])
+
+
+def compile_side_odds():
+    return np.array(
+        [
+            [odds[minute][side]["Probability"] for side in SIDES]
+            for minute in range(MINUTES)
+        ]
+    )
+
+
+def compile_event_odds():
+    return np.array(
+        [
+            [
+                [odds[minute][side]["Events"][key] for key in EVENT_KEYS]
+                for side in SIDES
+            ]
+            for minute in range(MINUTES)
+        ]
+    )
+
+
+def compile_card_odds(event_odds):
+    """Yellow card, red card and no card probabilities of a foul.
+
+    Mirrors the cumulative-weight semantics of `random.choices`, so ratios
+    above one saturate instead of going negative.
+    """
+    fouls = event_odds[:, :, [event_code("Foul")]]
+    cards = event_odds[:, :, [event_code("Yellow card"), event_code("Red card")]]
+    cards = np.divide(cards, fouls, out=np.zeros_like(cards), where=fouls > 0)
+    yellow = np.minimum(cards[:, :, 0], 1)
+    red = np.minimum(cards[:, :, 1], 1 - yellow)
+    return np.stack([yellow, red, 1 - yellow - red], axis=2)
+
+
+def compile_shot_odds():
+    shot_odds = np.array([shot_outcome[key]["Probability"] for key in SHOT_KEYS])
+    return shot_odds / shot_odds.sum()
+
+
+def compile_goal_odds():
+    is_goal = shot_outcome["On target"]["is_goal"]
+    return is_goal[1] / sum(is_goal.values())
+
+
+def compile_alias_tables(weights):
+    """Walker alias tables for drawing an index of the last axis of `weights`.
+
+    Returns `probabilities` and `aliases` of the same shape: draw a column
+    `i` uniformly, keep it with probability `probabilities[..., i]` and take
+    `aliases[..., i]` otherwise. The tables are built for all leading
+    indices at once by repeatedly pairing the column with the smallest
+    remaining scaled weight with the one with the largest.
+    """
+    columns = weights.shape[-1]
+    scaled = weights.reshape(-1, columns).astype(float)
+    scaled = scaled * columns / scaled.sum(axis=1, keepdims=True)
+    rows = np.arange(len(scaled))
+    probabilities = np.ones_like(scaled)
+    aliases = np.tile(np.arange(columns), (len(scaled), 1))
+    remaining = np.ones(scaled.shape, dtype=bool)
+    for _ in range(columns - 1):
+        small = np.where(remaining, scaled, np.inf).argmin(axis=1)
+        large = np.where(remaining, scaled, -np.inf).argmax(axis=1)
+        probabilities[rows, small] = scaled[rows, small]
+        aliases[rows, small] = large
+        scaled[rows, large] -= 1 - scaled[rows, small]
+        remaining[rows, small] = False
+    probabilities = np.minimum(probabilities, 1)
+    return probabilities.reshape(weights.shape), aliases.reshape(weights.shape)
+
+
+def alias_draw(random, probabilities, aliases):
+    """Draw an index from one row of alias tables, given as lists"""
+    return alias_index(random(), probabilities, aliases)
+
+
+def alias_index(uniform, probabilities, aliases):
+    """Index of one row of alias tables, given as lists, for a uniform in [0, 1)"""
+    draw = uniform * len(probabilities)
+    index = int(draw)
+    return index if draw - index < probabilities[index] else aliases[index]
+
+
+def alias_indices(uniforms, probabilities, aliases):
+    """`alias_index` for an array of uniforms and one row of alias tables"""
+    draws = uniforms * len(probabilities)
+    indices = draws.astype(np.int64)
+    return np.where(
+        draws - indices < probabilities[indices], indices, aliases[indices]
+    )
+
+
+def read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+EVENT_RATES = read_only(compile_event_rates())
+SIDE_ODDS = read_only(compile_side_odds())
+EVENT_ODDS = read_only(compile_event_odds())
+CUMULATIVE_SIDE_ODDS = read_only(SIDE_ODDS.cumsum(axis=1))
+CUMULATIVE_EVENT_ODDS = read_only(EVENT_ODDS.cumsum(axis=2))
+ATTEMPT_ODDS = read_only(EVENT_ODDS[:, :, ATTEMPT].copy())
+CARD_ODDS = read_only(compile_card_odds(EVENT_ODDS))
+SHOT_ODDS = read_only(compile_shot_odds())
+GOAL_ODDS = compile_goal_odds()
+SIDE_PROBABILITIES = read_only(SIDE_ODDS / SIDE_ODDS.sum(axis=1, keepdims=True))
+SCORING_ODDS = SHOT_ODDS[SHOT_KEYS.index("On target")] * GOAL_ODDS
+
+
+def compile_event_leaves():
+    """Flatten the resolution of every event type into leaves.
+
+    A leaf is one complete outcome of a triggered event, such as Attempt,
+    On target, Saved. Returns the event type code of each leaf, its chain
+    of (stat code, 1 if credited to the opponent) pairs, and the
+    probability of the leaf given its event type per (minute, side).
+    Follow-up event types resolve to an empty chain.
+    """
+    certain = np.ones((MINUTES, len(SIDES)))
+    events, chains, leaf_odds = [], [], []
+    for code, key in enumerate(EVENT_KEYS):
+        if key in FOLLOW_UP_KEYS:
+            leaves = [((), certain)]
+        elif key == "Attempt":
+            leaves = []
+            for shot, probability in zip(SHOT_KEYS, SHOT_ODDS):
+                chain = ((code, 0), (stat_code(shot), 0))
+                if shot == "On target":
+                    goal, saved = probability * GOAL_ODDS, probability * (1 - GOAL_ODDS)
+                    leaves.append((chain + ((GOAL, 0),), certain * goal))
+                    leaves.append((chain + ((SAVED, 1),), certain * saved))
+                else:
+                    leaves.append((chain, certain * probability))
+        elif key == "Foul":
+            chain = ((code, 0), (stat_code("Free kick won"), 1))
+            leaves = []
+            for index, card in enumerate(CARD_KEYS):
+                if card == "No card":
+                    leaves.append((chain, CARD_ODDS[:, :, index]))
+                else:
+                    card_event = (stat_code(card), 0)
+                    leaves.append((chain + (card_event,), CARD_ODDS[:, :, index]))
+        else:
+            leaves = [(((code, 0),), certain)]
+        for chain, odds_given_event in leaves:
+            events.append(code)
+            chains.append(chain)
+            leaf_odds.append(odds_given_event)
+    return np.array(events), tuple(chains), np.stack(leaf_odds, axis=2)
+
+
+LEAF_EVENTS, LEAF_CHAINS, LEAF_ODDS = compile_event_leaves()
+LEAF_EVENTS = read_only(LEAF_EVENTS)
+LEAF_ODDS = read_only(LEAF_ODDS)
+LEAVES = len(LEAF_CHAINS)
+# Stat codes that start a chain; every other event continues the one before
+CHAIN_HEADS = frozenset(chain[0][0] for chain in LEAF_CHAINS if chain)
+
+# Alias tables as nested lists, for drawing one value at a time in Python
+SHOT_ALIAS = tuple(table.tolist() for table in compile_alias_tables(SHOT_ODDS))
+CARD_ALIAS = tuple(table.tolist() for table in compile_alias_tables(CARD_ODDS))
+# Hazard -log(1 - rate) of a single trial of each minute, and the hazard
+# accumulated by the trials up to the end of each minute
+TRIAL_HAZARDS = read_only(-np.log1p(-EVENT_RATES))
+MINUTE_HAZARD_ENDS = read_only((TRIALS * TRIAL_HAZARDS).cumsum())
+
+
+def goal_probabilities(attempt_odds):
+    """Probability that a single trial ends in a goal, per (minute, side).
+
+    `attempt_odds` is a match's scaled Attempt column of shape (..., 100, 2);
+    a trial scores when it triggers, picks the side, draws an Attempt and
+    the shot is on target and beats the keeper.
+    """
+    totals = CUMULATIVE_EVENT_ODDS[:, :, -1] + attempt_odds - ATTEMPT_ODDS
+    return (
+        EVENT_RATES[:, None]
+        * SIDE_PROBABILITIES
+        * (attempt_odds / totals)
+        * SCORING_ODDS
+    )
@@ -1,28 +1,30 @@
-import pandas as pd
+import numpy as np
 
+from simulator.event import POSITIONS
+from simulator.manager import Manager
 from simulator.player import Player
-from manager import Manager
-
-df_players_data = pd.read_pickle("simulator/data/player_data")
+from simulator.player_store import club_records
+import simulator.tables as st
 
 
 class Team:
-    def __init__(self, team_name):
+    def __init__(self, team_name, rng=None):
         self.name = team_name
-        self.manager = Manager()
+        self.manager = Manager(rng.random) if rng is not None else Manager()
         self.players = {}
         self.squad = {}
         self.attack = 0
         self.midfield = 0
         self.defence = 0
+        self.weighted_selections = {}
         self.set_players()
         self.set_stats()
         self.set_squad()
+        self.set_selection()
 
     def set_players(self):
-        df_team_players_data = df_players_data[df_players_data["club"] == self.name]
-        for index, df_player in df_team_players_data.iterrows():
-            self.players[df_player["long_name"]] = Player(df_player)
+        for stats in club_records(self.name):
+            self.players[stats["long_name"]] = Player(stats)
 
     def set_stats(self):
         self.attackers = [
@@ -75,7 +77,57 @@ class Team:
         squad_gk = [player]
         self.squad = {
             "attackers": squad_attackers,
-            "midfielders": squad_attackers,
+            "midfielders": squad_midfielders,
             "defenders": squad_defenders,
             "goalkeeper": squad_gk,
         }
+
+    def set_selection(self):
+        """Compile the arrays used to attribute events to starters.
+
+        `starter_ids` holds the ids of each position group of the squad and
+        `starters` maps them to their players. Events are attributed by
+        picking a position group uniformly and then one of its starters
+        uniformly; `selection_ids` lists the starters of all groups and
+        `selection` the alias tables of that choice, so a single uniform
+        draws the player.
+        """
+        self.starter_ids = {
+            position: st.read_only(
+                np.array([player.id for player in self.squad[position]], np.int32)
+            )
+            for position in POSITIONS
+        }
+        self.starters = {
+            player.id: player for players in self.squad.values() for player in players
+        }
+        self.goalkeeper_id = self.squad["goalkeeper"][0].id
+        self.selection_ids = st.read_only(
+            np.concatenate(list(self.starter_ids.values()))
+        )
+        weights = np.concatenate(
+            [np.full(len(ids), 1 / len(ids)) for ids in self.starter_ids.values()]
+        )
+        probabilities, aliases = st.compile_alias_tables(weights)
+        self.selection = (
+            self.selection_ids.tolist(),
+            probabilities.tolist(),
+            aliases.tolist(),
+        )
+        self.selection_arrays = (st.read_only(probabilities), st.read_only(aliases))
+
+    def weighted_selection(self, attribute, position="attackers"):
+        """Alias tables choosing a starter of `position` by `attribute`.
+
+        For example attackers weighted by shooting, to pick goal scorers.
+        Returns the (ids, probabilities, aliases) arrays, memoized per team.
+        """
+        key = (attribute, position)
+        if key not in self.weighted_selections:
+            players = self.squad[position]
+            weights = np.array([getattr(player, attribute) for player in players])
+            self.weighted_selections[key] = (
+                self.starter_ids[position],
+                *(st.read_only(table) for table in st.compile_alias_tables(weights)),
+            )
+        return self.weighted_selections[key]
@@ -0,0 +1,69 @@
+"""The scoreline engine must match the full event engine and the exact odds.
+
+Both engines play the same fixtures from a fixed seed and are compared with
+the exact scoreline distribution of `simulator.outcomes`, and with each
+other. Tolerances allow for a few standard errors of NUM_MATCHES matches.
+"""
+import numpy as np
+import pytest
+
+from simulator.batch import simulate_counts, simulate_scores
+from simulator.league import League
+from simulator.match import matchup_odds
+from simulator.outcomes import expected_goals, match_probabilities
+import simulator.tables as st
+
+NUM_MATCHES = 4000
+SEED = 0
+GOALS_TOLERANCE = 0.1
+RESULT_TOLERANCE = 0.04
+
+
+def full_engine(fixtures, rng):
+    return simulate_counts(fixtures, rng)[:, :, st.GOAL]
+
+
+ENGINES = {"full": full_engine, "scoreline": simulate_scores}
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    """A lopsided and an even fixture of the Premier League"""
+    league = League(2)
+    names = league.team_names
+    return [
+        (league.teams[names[0]], league.teams[names[-1]]),
+        (league.teams[names[len(names) // 2]], league.teams[names[1]]),
+    ]
+
+
+def summarize(goals):
+    """Mean home and away goals and the home win, draw and away win rates"""
+    home, away = goals[:, 0], goals[:, 1]
+    return (
+        goals.mean(axis=0),
+        np.array([(home > away).mean(), (home == away).mean(), (home < away).mean()]),
+    )
+
+
+def play(engine, home, away):
+    rng = np.random.default_rng(SEED)
+    return summarize(ENGINES[engine]([(home, away)] * NUM_MATCHES, rng))
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_engine_matches_exact_odds(fixtures, engine):
+    for home, away in fixtures:
+        goals, results = play(engine, home, away)
+        _, exact_results = match_probabilities(home, away)
+        exact_goals = expected_goals(matchup_odds(home, away).attempt_odds)
+        np.testing.assert_allclose(goals, exact_goals, atol=GOALS_TOLERANCE)
+        np.testing.assert_allclose(results, exact_results, atol=RESULT_TOLERANCE)
+
+
+def test_scoreline_matches_full_engine(fixtures):
+    for home, away in fixtures:
+        full_goals, full_results = play("full", home, away)
+        goals, results = play("scoreline", home, away)
+        np.testing.assert_allclose(goals, full_goals, atol=GOALS_TOLERANCE)
+        np.testing.assert_allclose(results, full_results, atol=RESULT_TOLERANCE)